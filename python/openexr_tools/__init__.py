@@ -1,2 +1,6 @@
 import openexr_tools.enum  # noqa F401
 import openexr_tools.tools  # noqa F401
+import openexr_tools.sequence  # noqa F401
+import openexr_tools.aio  # noqa F401
+import openexr_tools.image  # noqa F401
+import openexr_tools.cache  # noqa F401
@@ -0,0 +1,122 @@
+from concurrent.futures import Executor  # noqa F401
+from numpy.typing import NDArray  # noqa F401
+from pathlib import Path  # noqa F401
+from typing import Any, Optional, Tuple, Union  # noqa F401
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
+import os
+
+from openexr_tools.tools import read_exr, write_exr
+# ------------------------------------------------------------------------------
+
+
+'''
+The aio module contains an asyncio interface for reading and writing EXR
+files without blocking the event loop.
+'''
+
+
+class AsyncExrIO:
+    '''
+    Reads and writes EXR files on an executor, so that decode and encode do not
+    block the event loop. At most max_concurrency reads and writes run at once.
+
+    Example:
+
+        >>> async with AsyncExrIO(max_concurrency=4) as io:
+        >>>     image, metadata = await io.read_exr('/tmp/foo.exr')
+        >>>     await io.write_exr('/tmp/bar.exr', image, metadata)
+    '''
+    def __init__(self, max_concurrency=None, executor=None):
+        # type: (Optional[int], Optional[Executor]) -> None
+        '''
+        Args:
+            max_concurrency (int, optional): Maximum number of concurrent reads
+                and writes. Default: CPU count.
+            executor (Executor, optional): Executor to run reads and writes on.
+                Default: None (a thread pool owned by this instance).
+
+        Raises:
+            ValueError: If max_concurrency is less than 1.
+        '''
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        if max_concurrency < 1:
+            msg = f'Max concurrency must be at least 1. {max_concurrency} < 1.'
+            raise ValueError(msg)
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+        self.max_concurrency = max_concurrency
+        self._executor = executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        # type: () -> AsyncExrIO
+        return self
+
+    async def __aexit__(self, *args):
+        # type: (Any) -> None
+        self.close()
+
+    def close(self):
+        # type: () -> None
+        '''
+        Shuts down the executor if it is owned by this instance.
+        '''
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def _run(self, func, *args, **kwargs):
+        # type: (Any, Any, Any) -> Any
+        '''
+        Runs given function on the executor, once a concurrency slot is free.
+
+        Args:
+            func (function): Function.
+            *args: Positional arguments.
+            **kwargs: Keyword arguments.
+
+        Returns:
+            object: Function result.
+        '''
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(
+                self._executor, partial(func, *args, **kwargs)
+            )
+
+    async def read_exr(self, fullpath, **kwargs):
+        # type: (Union[str, Path], Any) -> Tuple[NDArray, dict]
+        '''
+        Reads an OpenEXR image file. See tools.read_exr.
+
+        Args:
+            fullpath (str or Path): Image file path.
+            **kwargs: Keyword arguments passed to read_exr.
+
+        Returns:
+            tuple[numpy.NDArray, dict]: Image and metadata.
+        '''
+        return await self._run(read_exr, fullpath, **kwargs)
+
+    async def write_exr(self, fullpath, image, metadata, **kwargs):
+        # type: (Union[str, Path], NDArray, dict, Any) -> dict
+        '''
+        Writes image data and metadata as EXR to given file path. See
+        tools.write_exr.
+
+        Args:
+            fullpath (str or Path): Path to EXR file.
+            image (numpy.NDArray): Image data.
+            metadata (dict): Dictionary of EXR metadata.
+            **kwargs: Keyword arguments passed to write_exr.
+
+        Returns:
+            dict: Write info, such as the codec used.
+        '''
+        return await self._run(write_exr, fullpath, image, metadata, **kwargs)
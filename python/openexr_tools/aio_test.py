@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import asyncio
+import threading
+import unittest
+
+import numpy as np
+
+from openexr_tools.aio import AsyncExrIO
+from openexr_tools.enum import ImageCodec
+import openexr_tools.tools as tools
+# ------------------------------------------------------------------------------
+
+
+class AsyncExrIOTests(unittest.TestCase):
+    def test_init_error(self):
+        expected = 'Max concurrency must be at least 1. 0 < 1.'
+        with self.assertRaisesRegex(ValueError, expected):
+            AsyncExrIO(max_concurrency=0)
+
+    def test_read_write_exr(self):
+        async def run(root):
+            async with AsyncExrIO(max_concurrency=2) as io:
+                writes = []
+                for i in range(4):
+                    target = Path(root, f'test.{i}.exr')
+                    image = np.full((4, 6, 3), i, dtype=np.float16)
+                    writes.append(io.write_exr(
+                        target, image, dict(channels=list('rgb')),
+                        codec=ImageCodec.ZIP
+                    ))
+                infos = await asyncio.gather(*writes)
+                for info in infos:
+                    self.assertEqual(info['codec'], ImageCodec.ZIP)
+
+                reads = [
+                    io.read_exr(Path(root, f'test.{i}.exr'), channels=['g'])
+                    for i in range(4)
+                ]
+                return await asyncio.gather(*reads)
+
+        with TemporaryDirectory() as root:
+            result = asyncio.run(run(root))
+            for i, (image, metadata) in enumerate(result):
+                self.assertEqual(image.shape, (4, 6, 1))
+                self.assertEqual(image[0, 0, 0], i)
+                self.assertEqual(metadata['compression'], ImageCodec.ZIP)
+
+    def test_max_concurrency(self):
+        lock = threading.Lock()
+        state = dict(active=0, peak=0)
+
+        def func():
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            threading.Event().wait(0.01)
+            with lock:
+                state['active'] -= 1
+
+        async def run(io):
+            await asyncio.gather(*[io._run(func) for _ in range(8)])
+
+        executor = ThreadPoolExecutor(max_workers=8)
+        io = AsyncExrIO(max_concurrency=2, executor=executor)
+        asyncio.run(run(io))
+        io.close()
+        self.assertEqual(state['peak'], 2)
+
+        # executor is not owned by instance
+        executor.submit(func).result()
+        executor.shutdown()
+
+    def test_read_exr_error(self):
+        async def run(root):
+            async with AsyncExrIO() as io:
+                await io.read_exr(Path(root, 'foo.exr'))
+
+        with TemporaryDirectory() as root:
+            with self.assertRaisesRegex(IOError, 'foo.exr is not an EXR file.'):
+                asyncio.run(run(root))
+
+            tools.write_exr(Path(root, 'foo.exr'), np.zeros((2, 2), np.float16), {})
+            asyncio.run(run(root))
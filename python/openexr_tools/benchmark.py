@@ -0,0 +1,394 @@
+from numpy.typing import NDArray  # noqa F401
+from typing import Any, Dict, List, Optional, Tuple  # noqa F401
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import OpenEXR as openexr
+
+from openexr_tools.enum import ImageCodec
+from openexr_tools.tools import read_exr, write_exr
+# ------------------------------------------------------------------------------
+
+
+'''
+The benchmark module measures the throughput, compression ratio and memory
+usage of every ImageCodec over a deterministic synthetic corpus. Results are
+JSON serializable, so that they can be compared between releases.
+
+Usage:
+
+    python -m openexr_tools.benchmark --output results.json
+
+    # also measure whether OpenEXR releases the GIL while decoding
+    python -m openexr_tools.benchmark --gil --codecs piz
+'''
+
+
+def generate_corpus(
+    height=512,  # type: int
+    width=512,  # type: int
+    dtypes=(np.float16, np.float32),  # type: Any
+    channels=(1, 4, 8),  # type: Any
+    seed=0,  # type: int
+):
+    # type: (...) -> Dict[str, NDArray]
+    '''
+    Generates a deterministic corpus of synthetic images. Images are made for
+    every combination of kind, dtype and channel count. Kinds are:
+
+        * noise - uniform noise, a worst case for lossless codecs
+        * gradient - smooth ramps, a best case for predictive codecs
+        * render - flat mattes, soft shading and film grain, which resembles
+          a CG plate
+
+    Args:
+        height (int, optional): Image height. Default: 512.
+        width (int, optional): Image width. Default: 512.
+        dtypes (tuple, optional): Image dtypes. Default: (float16, float32).
+        channels (tuple[int], optional): Channel counts. Default: (1, 4, 8).
+        seed (int, optional): Random seed. Default: 0.
+
+    Returns:
+        dict: Dictionary of image name, such as "render_float16_4", to image.
+    '''
+    output = {}
+    for dtype in dtypes:
+        for chans in channels:
+            rng = np.random.default_rng(seed)
+            shape = (height, width, chans)
+            yy, xx = np.mgrid[0:height, 0:width] / max(height, width)
+
+            noise = rng.random(shape)
+
+            gradient = np.empty(shape)
+            for i in range(chans):
+                gradient[:, :, i] = (xx * (i + 1) + yy) / (i + 2)
+
+            # flat matte regions, shaded sphere and fine grain
+            render = np.empty(shape)
+            dist = np.sqrt((xx - 0.5) ** 2 + (yy - 0.5) ** 2)
+            sphere = np.clip(1 - dist / 0.35, 0, 1) ** 0.5
+            matte = (xx > 0.7).astype(float) * 0.25
+            for i in range(chans):
+                render[:, :, i] = np.maximum(sphere * (i + 1) / chans, matte)
+            render += rng.normal(0, 0.01, shape)
+
+            name = np.dtype(dtype).name
+            for kind, image in [
+                ('noise', noise), ('gradient', gradient), ('render', render)
+            ]:
+                output[f'{kind}_{name}_{chans}'] = image.astype(dtype)
+    return output
+
+
+def _measure(func, repeats):
+    # type: (Any, int) -> Dict[str, float]
+    '''
+    Measures the fastest run time and peak Python memory allocation of given
+    function. Memory allocated inside OpenEXR is not traced.
+
+    Args:
+        func (function): Function without arguments.
+        repeats (int): Number of runs.
+
+    Returns:
+        dict: Seconds and peak bytes.
+    '''
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return dict(seconds=min(seconds), peak_bytes=peak)
+
+
+def benchmark_codec(image, codec, root, repeats=3):
+    # type: (NDArray, ImageCodec, str, int) -> Dict[str, Any]
+    '''
+    Benchmarks writing and reading given image with given codec.
+
+    Args:
+        image (numpy.NDArray): Image.
+        codec (ImageCodec): Image codec.
+        root (str): Directory to write temporary file in.
+        repeats (int, optional): Number of timed runs. The fastest is kept.
+            Default: 3.
+
+    Returns:
+        dict: Encode and decode MB/s, compression ratio, peak memory in MB and
+            maximum absolute error.
+    '''
+    target = Path(root, f'benchmark_{codec.string}.exr').as_posix()
+    encode = _measure(lambda: write_exr(target, image, {}, codec=codec), repeats)
+    decode = _measure(lambda: read_exr(target), repeats)
+
+    result, _ = read_exr(target)
+    error = np.abs(result.astype(np.float64) - image.astype(np.float64)).max()
+    file_bytes = os.path.getsize(target)
+    os.remove(target)
+
+    mb = image.nbytes / 1e6
+    return dict(
+        codec=codec.string,
+        encode_mb_per_s=mb / max(encode['seconds'], 1e-9),
+        decode_mb_per_s=mb / max(decode['seconds'], 1e-9),
+        compression_ratio=image.nbytes / file_bytes,
+        file_bytes=file_bytes,
+        encode_peak_mb=encode['peak_bytes'] / 1e6,
+        decode_peak_mb=decode['peak_bytes'] / 1e6,
+        max_abs_error=float(error),
+    )
+
+
+def _count(stop, counter):
+    # type: (threading.Event, List[int]) -> None
+    '''
+    Counts iterations of a Python loop until stopped.
+
+    Args:
+        stop (threading.Event): Stop event.
+        counter (list[int]): Single item list holding the count.
+    '''
+    while not stop.is_set():
+        counter[0] += 1
+
+
+def _measure_gil(func):
+    # type: (Any) -> Dict[str, float]
+    '''
+    Measures how much of given function runs without the GIL, by counting
+    iterations of a Python loop on another thread, first while idle and then
+    while the function runs.
+
+    Args:
+        func (function): Function without arguments.
+
+    Returns:
+        dict: Seconds and ratio of loop rate during the call to idle loop
+            rate.
+    '''
+    stop = threading.Event()
+    counter = [0]
+    thread = threading.Thread(target=_count, args=(stop, counter))
+    thread.start()
+    try:
+        start = time.perf_counter()
+        time.sleep(0.05)
+        idle = counter[0] / (time.perf_counter() - start)
+
+        counter[0] = 0
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        busy = counter[0] / seconds
+    finally:
+        stop.set()
+        thread.join()
+    return dict(seconds=seconds, gil_ratio=busy / max(idle, 1e-9))
+
+
+def _decode_bands(fullpath, channels, height, workers):
+    # type: (str, List[str], int, int) -> None
+    '''
+    Decodes disjoint bands of scanlines of given file concurrently, with one
+    input file per thread, so that no chunk is decoded twice.
+
+    Args:
+        fullpath (str): Image file path.
+        channels (list[str]): EXR channel names.
+        height (int): Image height.
+        workers (int): Number of threads.
+    '''
+    # bands are aligned to 32 rows, the largest scanline chunk height
+    step = -(-height // (workers * 32)) * 32
+    bands = [(y, min(y + step, height)) for y in range(0, height, step)]
+
+    def decode(band):
+        # type: (Tuple[int, int]) -> None
+        img = openexr.InputFile(fullpath)
+        y0 = img.header()['dataWindow'].min.y
+        img.channels(
+            channels, scanLine1=y0 + band[0], scanLine2=y0 + band[1] - 1
+        )
+        img.close()
+
+    with ThreadPoolExecutor(max_workers=len(bands)) as pool:
+        list(pool.map(decode, bands))
+
+
+def benchmark_gil(image, root, codec=ImageCodec.PIZ, workers=None, repeats=3):
+    # type: (NDArray, str, ImageCodec, Optional[int], int) -> Dict[str, Any]
+    '''
+    Measures whether OpenEXR releases the GIL while it decodes given image,
+    and the speed up of decoding disjoint bands of scanlines on a pool of
+    Python threads, compared to a single pass.
+
+    A GIL ratio near 0 means the GIL is held throughout the native decode, so
+    decode threads run one at a time. A GIL ratio near 1, or near 0.5 on a
+    single CPU, means the GIL is released. Within a single call, OpenEXR
+    decodes chunks on its own thread pool, see set_threads.
+
+    Args:
+        image (numpy.NDArray): Image.
+        root (str): Directory to write temporary file in.
+        codec (ImageCodec, optional): Image codec. Default: ImageCodec.PIZ.
+        workers (int, optional): Number of decode threads.
+            Default: None (CPU count).
+        repeats (int, optional): Number of timed runs. The fastest is kept.
+            Default: 3.
+
+    Returns:
+        dict: GIL ratio of InputFile.channels, serial and concurrent decode
+            seconds and speed up.
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    target = Path(root, f'gil_{codec.string}.exr').as_posix()
+    write_exr(target, image, {}, codec=codec)
+
+    img = openexr.InputFile(target)
+    channels = list(img.header()['channels'].keys())
+    gil = _measure_gil(lambda: img.channels(channels))
+    serial = _measure(lambda: img.channels(channels), repeats)['seconds']
+    img.close()
+
+    height = image.shape[0]
+    parallel = _measure(
+        lambda: _decode_bands(target, channels, height, workers), repeats
+    )['seconds']
+    os.remove(target)
+
+    return dict(
+        codec=codec.string,
+        workers=workers,
+        decode_gil_ratio=gil['gil_ratio'],
+        serial_seconds=serial,
+        parallel_seconds=parallel,
+        speedup=serial / max(parallel, 1e-9),
+    )
+
+
+def run_benchmark(
+    corpus=None,  # type: Optional[Dict[str, NDArray]]
+    codecs=None,  # type: Optional[List[ImageCodec]]
+    repeats=3,  # type: int
+    gil=False,  # type: bool
+):
+    # type: (...) -> Dict[str, Any]
+    '''
+    Benchmarks every given codec over every image in given corpus.
+
+    Args:
+        corpus (dict, optional): Dictionary of image name to image.
+            Default: None (generate_corpus()).
+        codecs (list[ImageCodec], optional): Codecs to benchmark.
+            Default: None (all codecs).
+        repeats (int, optional): Number of timed runs. Default: 3.
+        gil (bool, optional): Also measure GIL release and concurrent decode
+            of every image, see benchmark_gil. Default: False.
+
+    Returns:
+        dict: JSON serializable environment and results.
+    '''
+    if corpus is None:
+        corpus = generate_corpus()
+    if codecs is None:
+        codecs = list(ImageCodec.__members__.values())
+
+    results = []
+    with TemporaryDirectory() as root:
+        for name, image in corpus.items():
+            for codec in codecs:
+                result = benchmark_codec(image, codec, root, repeats=repeats)
+                result = dict(
+                    image=name,
+                    dtype=image.dtype.name,
+                    shape=list(image.shape),
+                    image_mb=image.nbytes / 1e6,
+                    **result,
+                )
+                results.append(result)
+
+        gil_results = []
+        if gil:
+            for name, image in corpus.items():
+                result = benchmark_gil(image, root, repeats=repeats)
+                gil_results.append(dict(image=name, **result))
+
+    environment = dict(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        cpu_count=os.cpu_count(),
+        numpy=np.__version__,
+        openexr=getattr(openexr, '__version__', 'unknown'),
+        openexr_threads=getattr(openexr, 'global_thread_count', int)(),
+    )
+    output = dict(environment=environment, results=results)
+    if gil:
+        output['gil'] = gil_results
+    return output
+
+
+def main(args=None):
+    # type: (Optional[List[str]]) -> None
+    '''
+    Runs benchmark and writes JSON results to stdout or a file.
+
+    Args:
+        args (list[str], optional): Command line arguments. Default: None.
+    '''
+    parser = argparse.ArgumentParser(
+        description='Benchmark EXR codecs over a synthetic corpus.'
+    )
+    parser.add_argument('--output', help='JSON output file. Default: stdout.')
+    parser.add_argument('--height', type=int, default=512)
+    parser.add_argument('--width', type=int, default=512)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument(
+        '--gil', action='store_true',
+        help='Also measure GIL release and concurrent decode.'
+    )
+    parser.add_argument(
+        '--codecs', nargs='+', default=None,
+        help='Codec strings, such as "piz zip". Default: all codecs.'
+    )
+    parsed = parser.parse_args(args)
+
+    codecs = None
+    if parsed.codecs is not None:
+        codecs = [ImageCodec.from_string(x) for x in parsed.codecs]
+
+    corpus = generate_corpus(height=parsed.height, width=parsed.width)
+    result = run_benchmark(
+        corpus, codecs=codecs, repeats=parsed.repeats, gil=parsed.gil
+    )
+    text = json.dumps(result, indent=4)
+
+    if parsed.output is None:
+        sys.stdout.write(text + '\n')
+    else:
+        with open(parsed.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import time
+import unittest
+
+import numpy as np
+
+from openexr_tools.enum import ImageCodec
+import openexr_tools.benchmark as benchmark
+# ------------------------------------------------------------------------------
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_generate_corpus(self):
+        result = benchmark.generate_corpus(height=8, width=16, channels=(1, 3))
+        self.assertEqual(len(result), 12)
+        self.assertEqual(result['noise_float16_1'].shape, (8, 16, 1))
+        self.assertEqual(result['render_float32_3'].shape, (8, 16, 3))
+        self.assertEqual(result['gradient_float32_3'].dtype, np.float32)
+
+        # corpus is deterministic
+        expected = benchmark.generate_corpus(height=8, width=16, channels=(1, 3))
+        for key, val in result.items():
+            np.testing.assert_array_equal(val, expected[key])
+
+    def test_benchmark_codec(self):
+        image = benchmark.generate_corpus(8, 16, channels=(4,))['render_float16_4']
+        with TemporaryDirectory() as root:
+            result = benchmark.benchmark_codec(
+                image, ImageCodec.ZIP, root, repeats=1
+            )
+            self.assertEqual(list(Path(root).iterdir()), [])
+
+        self.assertEqual(result['codec'], 'zip')
+        self.assertEqual(result['max_abs_error'], 0)
+        for key in [
+            'encode_mb_per_s', 'decode_mb_per_s', 'compression_ratio',
+            'file_bytes', 'encode_peak_mb', 'decode_peak_mb'
+        ]:
+            self.assertGreater(result[key], 0)
+
+    def test_benchmark_gil(self):
+        image = benchmark.generate_corpus(64, 16, channels=(4,))['render_float16_4']
+        with TemporaryDirectory() as root:
+            result = benchmark.benchmark_gil(image, root, workers=2, repeats=1)
+            self.assertEqual(list(Path(root).iterdir()), [])
+
+        self.assertEqual(result['codec'], 'piz')
+        self.assertEqual(result['workers'], 2)
+        self.assertGreaterEqual(result['decode_gil_ratio'], 0)
+        for key in ['serial_seconds', 'parallel_seconds', 'speedup']:
+            self.assertGreater(result[key], 0)
+
+    def test_measure_gil(self):
+        # sleeping releases the GIL, spinning in Python holds it
+        result = benchmark._measure_gil(lambda: time.sleep(0.1))
+        self.assertGreater(result['gil_ratio'], 0.5)
+
+        def spin():
+            start = time.perf_counter()
+            while time.perf_counter() - start < 0.1:
+                pass
+
+        result = benchmark._measure_gil(spin)
+        self.assertLess(result['gil_ratio'], 0.9)
+
+    def test_run_benchmark(self):
+        corpus = benchmark.generate_corpus(8, 16, dtypes=(np.float16,), channels=(1,))
+        codecs = [ImageCodec.PIZ, ImageCodec.DWAA]
+        result = benchmark.run_benchmark(corpus, codecs=codecs, repeats=1)
+        self.assertEqual(
+            sorted(result['environment'].keys()),
+            [
+                'cpu_count', 'numpy', 'openexr', 'openexr_threads', 'platform',
+                'python',
+            ],
+        )
+        results = result['results']
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0]['image'], 'noise_float16_1')
+        self.assertEqual(results[0]['codec'], 'piz')
+        self.assertEqual(results[1]['codec'], 'dwaa')
+        self.assertEqual(results[0]['shape'], [8, 16, 1])
+        self.assertNotIn('gil', result)
+        json.dumps(result)
+
+        result = benchmark.run_benchmark(
+            corpus, codecs=codecs, repeats=1, gil=True
+        )
+        self.assertEqual(len(result['gil']), 3)
+        self.assertEqual(result['gil'][0]['image'], 'noise_float16_1')
+        json.dumps(result)
+
+    def test_main(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'result.json')
+            benchmark.main([
+                '--output', target.as_posix(), '--height', '4', '--width', '4',
+                '--repeats', '1', '--codecs', 'piz', 'ZIPS'
+            ])
+            with open(target) as f:
+                result = json.load(f)
+            codecs = sorted(set(x['codec'] for x in result['results']))
+            self.assertEqual(codecs, ['piz', 'zips'])
@@ -0,0 +1,132 @@
+from numpy.typing import NDArray  # noqa F401
+from typing import Any, Tuple, Union  # noqa F401
+
+from collections import OrderedDict
+from copy import deepcopy
+from pathlib import Path
+import os
+import threading
+
+from openexr_tools.tools import read_exr
+# ------------------------------------------------------------------------------
+
+
+'''
+The cache module contains the FrameCache class, an in-process cache of decoded
+EXR frames.
+'''
+
+
+class FrameCache:
+    '''
+    Least recently used cache of decoded EXR frames, bounded by a byte budget.
+    Frames are keyed on filepath, file size, modification time and read
+    arguments, so a frame that changes on disk is decoded again. Cached images
+    are read only, so that cached data cannot be mutated.
+
+    Example:
+
+        >>> cache = FrameCache(max_bytes=4 * 1024 ** 3)
+        >>> image, metadata = cache.read_exr('/tmp/foo.exr')
+        >>> image, metadata = cache.read_exr('/tmp/foo.exr')  # no decode
+        >>> cache.hits, cache.misses, cache.evictions
+        (1, 1, 0)
+    '''
+    def __init__(self, max_bytes=2 * 1024 ** 3):
+        # type: (int) -> None
+        '''
+        Args:
+            max_bytes (int, optional): Maximum total bytes of cached images.
+                Default: 2 GiB.
+
+        Raises:
+            ValueError: If max_bytes is negative.
+        '''
+        if max_bytes < 0:
+            msg = f'Max bytes must not be negative. {max_bytes} < 0.'
+            raise ValueError(msg)
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._frames)
+
+    def __repr__(self):
+        # type: () -> str
+        return f'''
+<FrameCache>
+   frames: {len(self)}
+   nbytes: {self.nbytes}
+max_bytes: {self.max_bytes}
+     hits: {self.hits}
+   misses: {self.misses}
+evictions: {self.evictions}'''[1:]
+
+    def read_exr(self, fullpath, **kwargs):
+        # type: (Union[str, Path], Any) -> Tuple[NDArray, dict]
+        '''
+        Reads an OpenEXR image file through the cache. See tools.read_exr.
+
+        Args:
+            fullpath (str or Path): Image file path.
+            **kwargs: Keyword arguments passed to read_exr.
+
+        Raises:
+            ValueError: If out keyword argument is given.
+
+        Returns:
+            tuple[numpy.NDArray, dict]: Read only image and metadata.
+        '''
+        if 'out' in kwargs:
+            msg = 'Cached reads do not support the out keyword argument.'
+            raise ValueError(msg)
+
+        fullpath = Path(fullpath).absolute().as_posix()
+        try:
+            stat = os.stat(fullpath)
+            key = (
+                fullpath, stat.st_size, stat.st_mtime_ns,
+                repr(sorted(kwargs.items()))
+            )  # type: Any
+        except OSError:
+            # let read_exr raise its own error
+            key = None
+
+        with self._lock:
+            if key in self._frames:
+                self.hits += 1
+                self._frames.move_to_end(key)
+                image, metadata = self._frames[key]
+                return image, deepcopy(metadata)
+            self.misses += 1
+
+        image, metadata = read_exr(fullpath, **kwargs)
+        image.setflags(write=False)
+
+        with self._lock:
+            # frames whose file could not be stat'd have no reliable key
+            if key is not None and key not in self._frames and \
+                    image.nbytes <= self.max_bytes:
+                self._frames[key] = (image, deepcopy(metadata))
+                self.nbytes += image.nbytes
+                while self.nbytes > self.max_bytes:
+                    _, (old, _) = self._frames.popitem(last=False)
+                    self.nbytes -= old.nbytes
+                    self.evictions += 1
+        return image, metadata
+
+    def clear(self):
+        # type: () -> None
+        '''
+        Removes all frames from the cache. Counters are not reset.
+        '''
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
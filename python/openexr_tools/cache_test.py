@@ -0,0 +1,145 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+import os
+import unittest
+
+import numpy as np
+
+from openexr_tools.cache import FrameCache
+import openexr_tools.cache as cache_module
+import openexr_tools.tools as tools
+# ------------------------------------------------------------------------------
+
+
+class FrameCacheTests(unittest.TestCase):
+    def write_exr(self, root, name='test.exr', value=0):
+        target = Path(root, name)
+        image = np.full((4, 8, 4), value, dtype=np.float32)
+        tools.write_exr(target, image, dict(channels=list('rgba')))
+        return target
+
+    def test_init_error(self):
+        expected = 'Max bytes must not be negative. -1 < 0.'
+        with self.assertRaisesRegex(ValueError, expected):
+            FrameCache(max_bytes=-1)
+
+    def test_repr(self):
+        cache = FrameCache(max_bytes=100)
+        expected = '''
+<FrameCache>
+   frames: 0
+   nbytes: 0
+max_bytes: 100
+     hits: 0
+   misses: 0
+evictions: 0'''[1:]
+        self.assertEqual(repr(cache), expected)
+
+    def test_read_exr(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root)
+            cache = FrameCache()
+
+            image, metadata = cache.read_exr(src)
+            self.assertFalse(image.flags.writeable)
+            self.assertEqual((cache.hits, cache.misses), (0, 1))
+            self.assertEqual(cache.nbytes, image.nbytes)
+            self.assertEqual(len(cache), 1)
+
+            metadata['foo'] = 'bar'
+            result, metadata = cache.read_exr(src)
+            self.assertIs(result, image)
+            self.assertNotIn('foo', metadata)
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+            with self.assertRaises(ValueError):
+                result[0, 0, 0] = 1
+
+            # read arguments are part of key
+            result, metadata = cache.read_exr(src, channels=['r'])
+            self.assertEqual(result.shape, (4, 8, 1))
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+            cache.read_exr(src, channels=['r'])
+            self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_read_exr_modified(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root, value=0)
+            cache = FrameCache()
+            cache.read_exr(src)
+
+            self.write_exr(root, value=1)
+            stat = os.stat(src)
+            os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            image, _ = cache.read_exr(src)
+            self.assertEqual(image[0, 0, 0], 1)
+            self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_read_exr_eviction(self):
+        with TemporaryDirectory() as root:
+            srcs = [self.write_exr(root, f'test.{i}.exr', i) for i in range(3)]
+            nbytes = 4 * 8 * 4 * 4
+            cache = FrameCache(max_bytes=2 * nbytes)
+
+            cache.read_exr(srcs[0])
+            cache.read_exr(srcs[1])
+            cache.read_exr(srcs[0])
+            cache.read_exr(srcs[2])
+            self.assertEqual(cache.evictions, 1)
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.nbytes, 2 * nbytes)
+
+            # least recently used frame was evicted
+            cache.read_exr(srcs[0])
+            self.assertEqual((cache.hits, cache.misses), (2, 3))
+            cache.read_exr(srcs[1])
+            self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_read_exr_too_large(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root)
+            cache = FrameCache(max_bytes=10)
+            image, _ = cache.read_exr(src)
+            self.assertFalse(image.flags.writeable)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(cache.evictions, 0)
+
+    def test_read_exr_errors(self):
+        with TemporaryDirectory() as root:
+            cache = FrameCache()
+            src = Path(root, 'foo.exr')
+            with self.assertRaisesRegex(IOError, 'foo.exr is not an EXR file.'):
+                cache.read_exr(src)
+
+            src = self.write_exr(root)
+            expected = 'Cached reads do not support the out keyword argument.'
+            with self.assertRaisesRegex(ValueError, expected):
+                cache.read_exr(src, out=np.zeros((4, 8, 4)))
+
+    def test_read_exr_stat_error(self):
+        def stat(fullpath):
+            raise OSError('stat failed')
+
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root)
+            cache = FrameCache()
+            cache_module.os = SimpleNamespace(stat=stat)  # type: ignore
+            try:
+                # file appeared between stat and read, so it is not cached
+                image, _ = cache.read_exr(src)
+                self.assertEqual(image.shape, (4, 8, 4))
+                self.assertEqual(len(cache), 0)
+                self.assertEqual(cache.misses, 1)
+            finally:
+                cache_module.os = os
+
+    def test_clear(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root)
+            cache = FrameCache()
+            cache.read_exr(src)
+            cache.clear()
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(cache.nbytes, 0)
+            self.assertEqual(cache.misses, 1)
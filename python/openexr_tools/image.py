@@ -0,0 +1,189 @@
+from numpy.typing import DTypeLike, NDArray  # noqa F401
+from pathlib import Path  # noqa F401
+from typing import Any, Dict, List, Optional, Tuple, Union  # noqa F401
+
+from copy import deepcopy
+
+import numpy as np
+
+import openexr_tools.tools as tools
+# ------------------------------------------------------------------------------
+
+
+'''
+The image module contains the ExrImage class, which decodes EXR channels on
+demand.
+'''
+
+
+class ExrImage:
+    '''
+    Lazily decoded OpenEXR image. The header is read on construction, but
+    channels are only decoded the first time they are accessed, after which
+    they are cached. Cached channels are read only.
+
+    Example:
+
+        >>> img = ExrImage('/tmp/foo.exr')
+        >>> img.channels
+        ['r', 'g', 'b', 'a', 'diffuse.r', 'z']
+        >>> img['z'].shape  # decodes z channel only
+        (1080, 1920)
+        >>> img[['r', 'g', 'b']].shape  # decodes r, g and b in one pass
+        (1080, 1920, 3)
+        >>> np.asarray(img).shape  # decodes remaining channels
+        (1080, 1920, 6)
+    '''
+    def __init__(self, fullpath):
+        # type: (Union[str, Path]) -> None
+        '''
+        Args:
+            fullpath (str or Path): Image file path.
+
+        Raises:
+            IOError: If given filepath is not an EXR file.
+            ValueError: If file is multi-part.
+        '''
+        self._file = tools._open_exr(fullpath)
+        header = self._file.header()
+
+        # map lowercase channel names to EXR channel names
+        exr_channels = tools._get_channels(header)
+        self._lut = {x.lower(): x for x in exr_channels}
+        self._dtypes = {
+            x.lower(): tools._get_dtype(header['channels'][x].type)
+            for x in exr_channels
+        }
+
+        win = header['dataWindow']
+        self.width = (win.max.x - win.min.x) + 1  # type: int
+        self.height = (win.max.y - win.min.y) + 1  # type: int
+        self._metadata = tools._clean_header(header, exr_channels)
+        self._cache = {}  # type: Dict[str, NDArray]
+
+    def __enter__(self):
+        # type: () -> ExrImage
+        return self
+
+    def __exit__(self, *args):
+        # type: (Any) -> None
+        self.close()
+
+    def __repr__(self):
+        # type: () -> str
+        return f'''
+<ExrImage>
+  channels: {self.channels}
+     shape: {self.shape}
+   decoded: {self.decoded}'''[1:]
+
+    def __getitem__(self, key):
+        # type: (Union[str, List[str]]) -> NDArray
+        '''
+        Gets channel data, decoding channels that are not yet cached.
+
+        Args:
+            key (str or list[str]): Channel name or list of channel names.
+
+        Raises:
+            KeyError: If a channel does not exist.
+
+        Returns:
+            numpy.NDArray: (H, W) array for a channel name or (H, W, C) array
+                for a list of channel names.
+        '''
+        if isinstance(key, str):
+            self._decode([key])
+            return self._cache[key.lower()]
+
+        self._decode(key)
+        return np.dstack([self._cache[x.lower()] for x in key])
+
+    def __array__(self, dtype=None, copy=None):
+        # type: (Optional[DTypeLike], Optional[bool]) -> NDArray
+        '''
+        Decodes all channels into a single (H, W, C) array.
+
+        Args:
+            dtype (numpy.dtype, optional): Output dtype. Default: None.
+            copy (bool, optional): Unused, the output is always a new array.
+                Default: None.
+
+        Returns:
+            numpy.NDArray: Image.
+        '''
+        image = self[self.channels]
+        if dtype is not None:
+            image = image.astype(dtype, copy=False)
+        return image
+
+    def _decode(self, channels):
+        # type: (List[str]) -> None
+        '''
+        Decodes all given channels that are not yet cached in a single pass
+        over the file.
+
+        Args:
+            channels (list[str]): Channel names.
+
+        Raises:
+            KeyError: If a channel does not exist.
+        '''
+        names = []  # type: List[str]
+        for chan in channels:
+            chan = chan.lower()
+            if chan not in self._lut:
+                msg = f'Channel {chan} not found. '
+                msg += f'Legal channels: {self.channels}.'
+                raise KeyError(msg)
+            if chan not in self._cache and chan not in names:
+                names.append(chan)
+
+        if names == []:
+            return
+
+        shape = (self.height, self.width)
+        buffers = self._file.channels([self._lut[x] for x in names])
+        for chan, buffer in zip(names, buffers):
+            self._cache[chan] = np \
+                .frombuffer(buffer, self._dtypes[chan]) \
+                .reshape(shape)
+
+    @property
+    def channels(self):
+        # type: () -> List[str]
+        '''
+        list[str]: Channel names in read order.
+        '''
+        return list(self._lut.keys())
+
+    @property
+    def decoded(self):
+        # type: () -> List[str]
+        '''
+        list[str]: Names of decoded channels.
+        '''
+        return [x for x in self.channels if x in self._cache]
+
+    @property
+    def metadata(self):
+        # type: () -> dict
+        '''
+        dict: Metadata, identical to that returned by read_exr.
+        '''
+        return deepcopy(self._metadata)
+
+    @property
+    def shape(self):
+        # type: () -> Tuple[int, int, int]
+        '''
+        tuple[int]: (H, W, C) shape of the full image.
+        '''
+        return self.height, self.width, len(self._lut)
+
+    def close(self):
+        # type: () -> None
+        '''
+        Closes the underlying file. Cached channels remain accessible.
+        '''
+        self._file.close()
@@ -0,0 +1,102 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+import numpy as np
+
+from openexr_tools.enum import ImageCodec
+from openexr_tools.image import ExrImage
+import openexr_tools.tools as tools
+# ------------------------------------------------------------------------------
+
+
+class ExrImageTests(unittest.TestCase):
+    def write_exr(self, root):
+        target = Path(root, 'test.exr')
+        image = np.random.rand(5, 10, 5).astype(np.float16)
+        metadata = dict(channels=list('rgba') + ['z'], foo='bar')
+        tools.write_exr(target, image, metadata, codec=ImageCodec.ZIP)
+        return target, image
+
+    def test_init(self):
+        with TemporaryDirectory() as root:
+            src, _ = self.write_exr(root)
+            with ExrImage(src) as img:
+                self.assertEqual(img.channels, list('rgbaz'))
+                self.assertEqual(img.shape, (5, 10, 5))
+                self.assertEqual(img.width, 10)
+                self.assertEqual(img.height, 5)
+                self.assertEqual(img.decoded, [])
+
+                _, expected = tools.read_exr(src)
+                result = img.metadata
+                self.assertEqual(result.keys(), expected.keys())
+                self.assertEqual(result['compression'], ImageCodec.ZIP)
+                self.assertEqual(result['foo'], 'bar')
+
+    def test_init_error(self):
+        with TemporaryDirectory() as root:
+            src = Path(root, 'foo.exr')
+            with self.assertRaisesRegex(IOError, 'foo.exr is not an EXR file.'):
+                ExrImage(src)
+
+    def test_repr(self):
+        with TemporaryDirectory() as root:
+            src, _ = self.write_exr(root)
+            img = ExrImage(src)
+            img['g']
+            expected = '''
+<ExrImage>
+  channels: ['r', 'g', 'b', 'a', 'z']
+     shape: (5, 10, 5)
+   decoded: ['g']'''[1:]
+            self.assertEqual(repr(img), expected)
+
+    def test_getitem(self):
+        with TemporaryDirectory() as root:
+            src, expected = self.write_exr(root)
+            img = ExrImage(src)
+
+            result = img['z']
+            self.assertEqual(result.shape, (5, 10))
+            self.assertEqual(result.dtype, np.float16)
+            self.assertFalse(result.flags.writeable)
+            np.testing.assert_array_equal(result, expected[:, :, 4])
+            self.assertEqual(img.decoded, ['z'])
+            self.assertIs(img['Z'], result)
+
+            result = img[['b', 'r']]
+            self.assertEqual(result.shape, (5, 10, 2))
+            np.testing.assert_array_equal(result, expected[:, :, [2, 0]])
+            self.assertEqual(img.decoded, ['r', 'b', 'z'])
+
+    def test_getitem_error(self):
+        with TemporaryDirectory() as root:
+            src, _ = self.write_exr(root)
+            img = ExrImage(src)
+            expected = 'Channel x not found. '
+            expected += r"Legal channels: \['r', 'g', 'b', 'a', 'z'\]."
+            with self.assertRaisesRegex(KeyError, expected):
+                img[['r', 'x']]
+            self.assertEqual(img.decoded, [])
+
+    def test_array(self):
+        with TemporaryDirectory() as root:
+            src, expected = self.write_exr(root)
+            img = ExrImage(src)
+            img['a']
+
+            result = np.asarray(img)
+            np.testing.assert_array_equal(result, expected)
+            self.assertEqual(img.decoded, list('rgbaz'))
+
+            result = np.asarray(img, dtype=np.float32)
+            self.assertEqual(result.dtype, np.float32)
+
+    def test_close(self):
+        with TemporaryDirectory() as root:
+            src, expected = self.write_exr(root)
+            img = ExrImage(src)
+            img['r']
+            img.close()
+            np.testing.assert_array_equal(img['r'], expected[:, :, 0])
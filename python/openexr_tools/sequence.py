@@ -0,0 +1,237 @@
+from concurrent.futures import Executor  # noqa F401
+from numpy.typing import NDArray  # noqa F401
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union  # noqa F401
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+import os
+import re
+
+from openexr_tools.enum import ImageCodec
+from openexr_tools.tools import read_exr, write_exr
+# ------------------------------------------------------------------------------
+
+
+'''
+The sequence module contains functions for reading and writing EXR image
+sequences with a pool of workers.
+'''
+
+
+def _get_executor(executor, workers):
+    # type: (str, int) -> Executor
+    '''
+    Creates a worker pool.
+
+    Args:
+        executor (str): Pool type. Options: thread, process.
+        workers (int): Number of workers.
+
+    Raises:
+        ValueError: If executor is not a legal pool type.
+
+    Returns:
+        Executor: Worker pool.
+    '''
+    if executor == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    elif executor == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+
+    msg = f'Illegal executor: {executor}. Legal executors: thread, process.'
+    raise ValueError(msg)
+
+
+def get_frame_paths(pattern, frames=None):
+    # type: (Union[str, Path], Optional[Iterable[int]]) -> List[Tuple[int, str]]
+    '''
+    Gets frame numbers and filepaths of an image sequence. Pattern uses a run
+    of "#" characters as a zero padded frame number, such as "shot.####.exr".
+
+    Args:
+        pattern (str or Path): Frame pattern.
+        frames (list[int], optional): Frames to get. Default: None (all frames
+            found on disk).
+
+    Raises:
+        ValueError: If pattern has no frame token in its filename.
+
+    Returns:
+        list[tuple[int, str]]: Frame number and filepath pairs sorted by
+            frame.
+    '''
+    pattern = Path(pattern).absolute()
+    found = re.search('#+', pattern.name)
+    if found is None:
+        msg = f'Pattern {pattern} has no frame token in its filename.'
+        raise ValueError(msg)
+
+    head = pattern.name[:found.start()]
+    tail = pattern.name[found.end():]
+    pad = found.end() - found.start()
+
+    if frames is not None:
+        return [
+            (x, Path(pattern.parent, f'{head}{x:0{pad}d}{tail}').as_posix())
+            for x in sorted(frames)
+        ]
+
+    regex = re.compile(
+        re.escape(head) + f'(-?\\d{{{pad},}})' + re.escape(tail) + '$'
+    )
+    output = []
+    for path in pattern.parent.iterdir():
+        match = regex.match(path.name)
+        if match is not None:
+            output.append((int(match.group(1)), path.as_posix()))
+    return sorted(output)
+
+
+def _get_frames(paths):
+    # type: (List[Union[str, Path]]) -> List[Tuple[int, str]]
+    '''
+    Gets frame numbers from the last digits in each filename of given paths.
+    Paths without digits are numbered by their index.
+
+    Args:
+        paths (list[str or Path]): Filepaths.
+
+    Returns:
+        list[tuple[int, str]]: Frame number and filepath pairs in given order.
+    '''
+    output = []
+    for i, path in enumerate(paths):
+        path = Path(path).absolute()
+        found = re.findall(r'\d+', path.name)
+        frame = int(found[-1]) if found != [] else i
+        output.append((frame, path.as_posix()))
+    return output
+
+
+def read_exr_sequence(
+    paths,  # type: Union[str, Path, List[Union[str, Path]]]
+    frames=None,  # type: Optional[Iterable[int]]
+    workers=None,  # type: Optional[int]
+    executor='thread',  # type: str
+    max_in_flight=None,  # type: Optional[int]
+    **kwargs,  # type: Any
+):
+    # type: (...) -> Iterator[Tuple[int, NDArray, dict]]
+    '''
+    Reads an EXR image sequence with a pool of workers. Frames are yielded in
+    order. At most max_in_flight frames are decoded or waiting to be consumed
+    at any time, which bounds memory usage.
+
+    Args:
+        paths (str, Path or list): Frame pattern, such as "shot.####.exr", or
+            list of filepaths.
+        frames (list[int], optional): Frames to read if paths is a pattern.
+            Default: None (all frames found on disk).
+        workers (int, optional): Number of workers. Default: CPU count.
+        executor (str, optional): Pool type. Options: thread, process.
+            Default: thread.
+        max_in_flight (int, optional): Maximum number of frames held in memory.
+            Default: 2 * workers.
+        **kwargs: Keyword arguments passed to read_exr, such as channels or
+            region.
+
+    Raises:
+        ValueError: If executor is not a legal pool type.
+
+    Yields:
+        tuple[int, numpy.NDArray, dict]: Frame number, image and metadata.
+    '''
+    if isinstance(paths, (str, Path)):
+        items = get_frame_paths(paths, frames=frames)
+    else:
+        items = _get_frames(list(paths))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+    max_in_flight = max(max_in_flight, 1)
+
+    pool = _get_executor(executor, workers)
+
+    queue = deque()  # type: deque
+    try:
+        for frame, path in items:
+            if len(queue) >= max_in_flight:
+                frame_, future = queue.popleft()
+                yield (frame_, *future.result())
+            queue.append((frame, pool.submit(read_exr, path, **kwargs)))
+
+        while len(queue) > 0:
+            frame_, future = queue.popleft()
+            yield (frame_, *future.result())
+    finally:
+        for _, future in queue:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+def write_exr_sequence(
+    items,  # type: Iterable[Tuple[Union[str, Path], NDArray, dict]]
+    codec=ImageCodec.PIZ,  # type: Union[ImageCodec, str]
+    workers=None,  # type: Optional[int]
+    executor='thread',  # type: str
+    max_in_flight=None,  # type: Optional[int]
+):
+    # type: (...) -> Dict[Union[str, Path], dict]
+    '''
+    Writes EXR images with a pool of workers. Items are pulled from the given
+    iterable only when fewer than max_in_flight writes are pending, so a lazy
+    producer is throttled rather than buffered in memory.
+
+    Args:
+        items (iterable): Iterable of (filepath, image, metadata) tuples.
+        codec (ImageCodec or str, optional): Image codec or "auto".
+            Default: ImageCodec.PIZ.
+        workers (int, optional): Number of workers. Default: CPU count.
+        executor (str, optional): Pool type. Options: thread, process.
+            Default: thread.
+        max_in_flight (int, optional): Maximum number of pending writes.
+            Default: 2 * workers.
+
+    Raises:
+        ValueError: If executor is not a legal pool type.
+
+    Returns:
+        dict: Dictionary of filepath to write info, such as the codec used,
+            in item order.
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 2 * workers
+    max_in_flight = max(max_in_flight, 1)
+
+    pool = _get_executor(executor, workers)
+
+    output = {}  # type: Dict[Union[str, Path], Any]
+    pending = {}  # type: dict
+    try:
+        for fullpath, image, metadata in items:
+            if len(pending) >= max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    output[pending.pop(future)] = future.result()
+
+            # reserve item order before the write completes
+            output[fullpath] = None
+            future = pool.submit(
+                write_exr, fullpath, image, metadata, codec=codec
+            )
+            pending[future] = fullpath
+
+        for future in wait(pending).done:
+            output[pending[future]] = future.result()
+        pending = {}
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+    return output
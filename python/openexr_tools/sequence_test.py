@@ -0,0 +1,142 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import unittest
+
+import numpy as np
+
+from openexr_tools.enum import ImageCodec
+import openexr_tools.sequence as sequence
+import openexr_tools.tools as tools
+# ------------------------------------------------------------------------------
+
+
+class SequenceTests(unittest.TestCase):
+    def write_sequence(self, root, frames=range(1001, 1006)):
+        metadata = dict(channels=list('rgb'))
+        for frame in frames:
+            target = Path(root, f'shot.{frame:04d}.exr')
+            image = np.full((4, 6, 3), frame, dtype=np.float32)
+            tools.write_exr(target, image, metadata)
+        return Path(root, 'shot.####.exr')
+
+    def test_get_frame_paths(self):
+        with TemporaryDirectory() as root:
+            pattern = self.write_sequence(root)
+            Path(root, 'shot.1001.png').touch()
+            Path(root, 'other.1001.exr').touch()
+
+            result = sequence.get_frame_paths(pattern)
+            self.assertEqual([x[0] for x in result], list(range(1001, 1006)))
+            expected = Path(root, 'shot.1003.exr').as_posix()
+            self.assertEqual(result[2][1], expected)
+
+            result = sequence.get_frame_paths(pattern, frames=[7, 3])
+            expected = [
+                (3, Path(root, 'shot.0003.exr').as_posix()),
+                (7, Path(root, 'shot.0007.exr').as_posix()),
+            ]
+            self.assertEqual(result, expected)
+
+    def test_get_frame_paths_error(self):
+        expected = 'Pattern .*shot.exr has no frame token in its filename.'
+        with self.assertRaisesRegex(ValueError, expected):
+            sequence.get_frame_paths('/tmp/shot.exr')
+
+    def test_read_exr_sequence(self):
+        with TemporaryDirectory() as root:
+            pattern = self.write_sequence(root)
+            result = list(sequence.read_exr_sequence(pattern, workers=2))
+            self.assertEqual([x[0] for x in result], list(range(1001, 1006)))
+            for frame, image, metadata in result:
+                self.assertEqual(image.shape, (4, 6, 3))
+                self.assertEqual(image[0, 0, 0], frame)
+                self.assertEqual(metadata['channels'], list('rgb'))
+
+    def test_read_exr_sequence_paths(self):
+        with TemporaryDirectory() as root:
+            self.write_sequence(root)
+            paths = [Path(root, f'shot.{x}.exr') for x in [1004, 1002]]
+            result = sequence.read_exr_sequence(
+                paths, workers=1, max_in_flight=1, channels=['g']
+            )
+            result = list(result)
+            self.assertEqual([x[0] for x in result], [1004, 1002])
+            self.assertEqual(result[0][1].shape, (4, 6, 1))
+            self.assertEqual(result[0][1][0, 0, 0], 1004)
+
+    def test_read_exr_sequence_process(self):
+        with TemporaryDirectory() as root:
+            pattern = self.write_sequence(root)
+            result = sequence.read_exr_sequence(
+                pattern, frames=[1002, 1003], workers=2, executor='process'
+            )
+            result = list(result)
+            self.assertEqual([x[0] for x in result], [1002, 1003])
+            self.assertEqual(result[1][1][0, 0, 0], 1003)
+
+    def test_read_exr_sequence_error(self):
+        with TemporaryDirectory() as root:
+            pattern = self.write_sequence(root)
+            expected = 'Illegal executor: foo. Legal executors: thread, process.'
+            with self.assertRaisesRegex(ValueError, expected):
+                list(sequence.read_exr_sequence(pattern, executor='foo'))
+
+    def test_write_exr_sequence(self):
+        with TemporaryDirectory() as root:
+            consumed = []
+
+            def items():
+                for frame in range(1, 7):
+                    consumed.append(frame)
+                    target = Path(root, f'shot.{frame:04d}.exr')
+                    image = np.full((4, 6, 2), frame, dtype=np.float16)
+                    yield target, image, dict(channels=['x', 'y'])
+
+            result = sequence.write_exr_sequence(
+                items(), codec=ImageCodec.ZIP, workers=2, max_in_flight=2
+            )
+            self.assertEqual(consumed, list(range(1, 7)))
+            expected = [Path(root, f'shot.{x:04d}.exr') for x in range(1, 7)]
+            self.assertEqual(list(result.keys()), expected)
+            for info in result.values():
+                self.assertEqual(info['codec'], ImageCodec.ZIP)
+
+            pattern = Path(root, 'shot.####.exr')
+            result = list(sequence.read_exr_sequence(pattern))
+            self.assertEqual([x[0] for x in result], list(range(1, 7)))
+            for frame, image, metadata in result:
+                self.assertEqual(image[0, 0, 0], frame)
+                self.assertEqual(metadata['channels'], ['x', 'y'])
+                self.assertEqual(metadata['compression'], ImageCodec.ZIP)
+
+    def test_write_exr_sequence_auto(self):
+        with TemporaryDirectory() as root:
+            items = [
+                (Path(root, f'shot.{x:04d}.exr'), np.zeros((4, 6), np.float16), {})
+                for x in range(3)
+            ]
+            result = sequence.write_exr_sequence(items, codec='auto', workers=2)
+            self.assertEqual(len(result), 3)
+            for info in result.values():
+                self.assertIsInstance(info['codec'], ImageCodec)
+                self.assertEqual(info['objective'], 'size')
+
+    def test_write_exr_sequence_process(self):
+        with TemporaryDirectory() as root:
+            items = [
+                (Path(root, f'shot.{x:04d}.exr'), np.zeros((4, 6), np.float32), {})
+                for x in range(3)
+            ]
+            sequence.write_exr_sequence(items, workers=2, executor='process')
+            result = sequence.get_frame_paths(Path(root, 'shot.####.exr'))
+            self.assertEqual([x[0] for x in result], [0, 1, 2])
+
+    def test_write_exr_sequence_error(self):
+        with TemporaryDirectory() as root:
+            items = [
+                (Path(root, f'shot.{x:04d}.exr'), np.zeros((4, 6), np.uint8), {})
+                for x in range(3)
+            ]
+            expected = 'EXR cannot be saved with array of dtype: uint8.'
+            with self.assertRaisesRegex(TypeError, expected):
+                sequence.write_exr_sequence(items, workers=1)
@@ -1,8 +1,14 @@
 from numpy.typing import DTypeLike, NDArray  # noqa F401
-from typing import Tuple, Union  # noqa F401
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union  # noqa F401
 
 from copy import deepcopy
+from fnmatch import fnmatchcase
+from functools import wraps
 from pathlib import Path
+from tempfile import TemporaryDirectory
+import inspect
+import os
+import time
 
 import Imath as imath
 import numpy as np
@@ -12,69 +18,1242 @@
 # ------------------------------------------------------------------------------
 
 
-def read_exr(fullpath):
-    # type: (Union[str, Path]) -> Tuple[NDArray, dict]
+# number of scanlines decoded per read call, a multiple of the scanlines per
+# chunk of every EXR codec, so that no chunk is decoded twice
+_BLOCK_ROWS = 256
+
+# number of scanlines per block sampled by codec trials, which is the largest
+# chunk height of the candidate codecs
+_TRIAL_ROWS = 32
+
+_Function = TypeVar('_Function', bound=Callable[..., Any])
+
+
+def _get_channels(metadata):
+    # type: (dict) -> List[str]
+    '''
+    Gets EXR channel names from given header in read order. RGBA channels come
+    first, followed by all other channels in alphabetical order.
+
+    Args:
+        metadata (dict): EXR header.
+
+    Returns:
+        list[str]: EXR channel names.
+    '''
+    # EXR headers store channel data in a map, so there can be no suuport for
+    # arbitrary channel order persistence.
+    temp = sorted(metadata['channels'].keys())
+    channels = []
+    for chan in list('RGBA'):
+        if chan in temp:
+            channels.append(chan)
+            temp.remove(chan)
+    for chan in temp:
+        channels.append(chan)
+    return channels
+
+
+def _get_dtype(pixel_type):
+    # type: (imath.PixelType) -> DTypeLike
+    '''
+    Gets the numpy dtype of given EXR pixel type.
+
+    Args:
+        pixel_type (Imath.PixelType): EXR pixel type.
+
+    Returns:
+        numpy.dtype: HALF is float16, FLOAT is float32 and UINT is uint32.
+    '''
+    lut = dict(HALF=np.float16, FLOAT=np.float32, UINT=np.uint32)
+    return lut[str(pixel_type)]
+
+
+def _get_pixel_type(dtype):
+    # type: (DTypeLike) -> imath.PixelType
+    '''
+    Gets the EXR pixel type of given numpy dtype.
+
+    Args:
+        dtype (numpy.dtype): float16, float32 or uint32.
+
+    Raises:
+        TypeError: If dtype has no EXR pixel type.
+
+    Returns:
+        Imath.PixelType: EXR pixel type.
+    '''
+    dtype = np.dtype(dtype)
+    lut = dict(float16='HALF', float32='FLOAT', uint32='UINT')
+    if dtype.name not in lut:
+        msg = f'No EXR pixel type for dtype: {dtype}. '
+        msg += f'Legal dtypes: {list(lut.keys())}.'
+        raise TypeError(msg)
+    return imath.PixelType(getattr(imath.PixelType, lut[dtype.name]))
+
+
+def _select_channels(channels, patterns):
+    # type: (List[str], Union[str, List[str]]) -> List[str]
+    '''
+    Selects channels which match given names or glob patterns. Matching is case
+    insensitive. Channels are returned in pattern order, without duplicates.
+
+    Args:
+        channels (list[str]): EXR channel names.
+        patterns (str or list[str]): Channel names or glob patterns.
+
+    Raises:
+        ValueError: If a pattern matches no channels.
+
+    Returns:
+        list[str]: Selected EXR channel names.
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    output = []  # type: List[str]
+    for pattern in patterns:
+        found = [
+            x for x in channels if fnmatchcase(x.lower(), pattern.lower())
+        ]
+        if found == []:
+            legal = [x.lower() for x in channels]
+            msg = f'No channels found matching pattern: {pattern}. '
+            msg += f'Legal channels: {legal}.'
+            raise ValueError(msg)
+
+        for chan in found:
+            if chan not in output:
+                output.append(chan)
+    return output
+
+
+def _get_layers(channels):
+    # type: (List[str]) -> Dict[str, List[str]]
+    '''
+    Groups given EXR channel names by layer. The layer of a channel is its
+    name up to the last period, so diffuse.R belongs to the diffuse layer.
+    Channels without a period belong to the default layer, named "". Within a
+    layer, RGBA channels of either case come first, followed by all other
+    channels in alphabetical order.
+
+    Args:
+        channels (list[str]): EXR channel names.
+
+    Returns:
+        dict: Dictionary of layer name to EXR channel names.
+    '''
+    output = {}  # type: Dict[str, List[str]]
+    for chan in channels:
+        layer = chan.rpartition('.')[0]
+        output.setdefault(layer, []).append(chan)
+
+    for layer, chans in output.items():
+        lut = {}
+        for chan in chans:
+            name = chan.rpartition('.')[2]
+            if name.lower() in list('rgba'):
+                name = name.upper()
+            lut[name] = chan
+        output[layer] = [lut[x] for x in _get_channels(dict(channels=lut))]
+    return output
+
+
+def _select_layers(
+    layers,  # type: Dict[str, List[str]]
+    patterns,  # type: Union[str, List[str]]
+):
+    # type: (...) -> Dict[str, List[str]]
+    '''
+    Selects layers which match given names or glob patterns. Matching is case
+    insensitive. Layers are returned in pattern order, without duplicates.
+
+    Args:
+        layers (dict): Dictionary of layer name to EXR channel names.
+        patterns (str or list[str]): Layer names or glob patterns.
+
+    Raises:
+        ValueError: If a pattern matches no layers.
+
+    Returns:
+        dict: Selected layers.
+    '''
+    if isinstance(patterns, str):
+        patterns = [patterns]
+
+    output = {}  # type: Dict[str, List[str]]
+    for pattern in patterns:
+        found = [
+            x for x in layers.keys()
+            if fnmatchcase(x.lower(), pattern.lower())
+        ]
+        if found == []:
+            legal = [x.lower() for x in layers.keys()]
+            msg = f'No layers found matching pattern: {pattern}. '
+            msg += f'Legal layers: {legal}.'
+            raise ValueError(msg)
+
+        for layer in found:
+            output.setdefault(layer, layers[layer])
+    return output
+
+
+def _get_region(region, width, height):
+    # type: (Optional[Tuple[int, ...]], int, int) -> Tuple[int, int, int, int]
+    '''
+    Resolves a region of interest into an (x0, y0, x1, y1) box. Coordinates are
+    pixel indices relative to the data window, with exclusive ends.
+
+    Args:
+        region (tuple[int], optional): (y0, y1) row range or (x0, y0, x1, y1)
+            box. If None, the whole image is returned.
+        width (int): Image width.
+        height (int): Image height.
+
+    Raises:
+        ValueError: If region is not of length 2 or 4.
+        ValueError: If region is empty or exceeds image bounds.
+
+    Returns:
+        tuple[int]: (x0, y0, x1, y1) box.
+    '''
+    if region is None:
+        return 0, 0, width, height
+
+    if len(region) == 2:
+        y0, y1 = region
+        x0, x1 = 0, width
+    elif len(region) == 4:
+        x0, y0, x1, y1 = region
+    else:
+        msg = 'Region must be a (y0, y1) row range or a (x0, y0, x1, y1) box. '
+        msg += f'Given region: {region}.'
+        raise ValueError(msg)
+
+    if not (0 <= x0 < x1 <= width and 0 <= y0 < y1 <= height):
+        msg = f'Region {tuple(region)} is empty or exceeds image bounds: '
+        msg += f'(0, 0, {width}, {height}).'
+        raise ValueError(msg)
+    return x0, y0, x1, y1
+
+
+def _check_layout(layout):
+    # type: (str) -> None
+    '''
+    Checks that given image layout is legal.
+
+    Args:
+        layout (str): Image layout.
+
+    Raises:
+        ValueError: If layout is not interleaved or planar.
+    '''
+    if layout not in ['interleaved', 'planar']:
+        msg = f'Illegal layout: {layout}. Legal layouts: interleaved, planar.'
+        raise ValueError(msg)
+
+
+def _get_exr_path(fullpath):
+    # type: (Union[str, Path]) -> str
+    '''
+    Ensures given filepath is an OpenEXR image file.
+
+    Args:
+        fullpath (str or Path): Image file path.
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+
+    Returns:
+        str: Image file path.
+    '''
+    if isinstance(fullpath, Path):
+        fullpath = fullpath.absolute().as_posix()
+
+    if not openexr.isOpenExrFile(fullpath):
+        msg = f'{fullpath} is not an EXR file.'
+        raise IOError(msg)
+    return fullpath
+
+
+def _open_exr(fullpath, multipart=False):
+    # type: (Union[str, Path], bool) -> openexr.InputFile
+    '''
+    Opens an OpenEXR image file for reading. Only the header and offset table
+    are read.
+
+    Args:
+        fullpath (str or Path): Image file path.
+        multipart (bool, optional): Allow multi-part files, of which only the
+            first part can be read. Default: False.
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part and multipart is False.
+
+    Returns:
+        OpenEXR.InputFile: Input file.
+    '''
+    fullpath = _get_exr_path(fullpath)
+
+    # the scanline reader silently reads the first part of multi-part files
+    if not multipart:
+        with open(fullpath, 'rb') as f:
+            flags = int.from_bytes(f.read(8)[4:8], 'little')
+        if flags & 0x1000:
+            msg = f'{fullpath} is a multi-part EXR file. '
+            msg += 'Use read_exr_parts to read it.'
+            raise ValueError(msg)
+
+    return openexr.InputFile(fullpath)
+
+
+def _get_level_count(size, round_up=False):
+    # type: (int, bool) -> int
+    '''
+    Gets the number of mip levels of given size, down to a size of 1.
+
+    Args:
+        size (int): Level 0 size.
+        round_up (bool, optional): Round level sizes up. Default: False.
+
+    Returns:
+        int: Number of levels.
+    '''
+    if round_up:
+        return (size - 1).bit_length() + 1
+    return size.bit_length()
+
+
+def _get_tile_info(tiles, width, height):
+    # type: (Any, int, int) -> dict
+    '''
+    Gets tile size, tile counts and level counts of a tiled EXR.
+
+    Args:
+        tiles (object): Imath or OpenEXR TileDescription.
+        width (int): Image width.
+        height (int): Image height.
+
+    Returns:
+        dict: Tile info.
+    '''
+    # imath enums print as MODE, OpenEXR enums as LevelMode.MODE
+    mode = str(tiles.mode).split('.')[-1]
+    rounding = str(tiles.roundingMode).split('.')[-1]
+    round_up = rounding == 'ROUND_UP'
+
+    levels_x = levels_y = 1
+    if mode == 'MIPMAP_LEVELS':
+        levels_x = levels_y = _get_level_count(max(width, height), round_up)
+    elif mode == 'RIPMAP_LEVELS':
+        levels_x = _get_level_count(width, round_up)
+        levels_y = _get_level_count(height, round_up)
+
+    return dict(
+        x_size=tiles.xSize,
+        y_size=tiles.ySize,
+        mode=mode,
+        rounding=rounding,
+        num_x=-(-width // tiles.xSize),
+        num_y=-(-height // tiles.ySize),
+        levels_x=levels_x,
+        levels_y=levels_y,
+    )
+
+
+def _clean_header(metadata, channels):
+    # type: (dict, List[str]) -> dict
+    '''
+    Converts given EXR header into metadata returned by read functions.
+    Channels are lowercased, compression is converted to an ImageCodec, tile
+    descriptions are converted to tile info dictionaries and bytes are decoded
+    to strings.
+
+    Args:
+        metadata (dict): EXR header.
+        channels (list[str]): EXR channel names in read order.
+
+    Returns:
+        dict: Metadata.
+    '''
+    metadata['channels'] = [x.lower() for x in channels]
+    metadata['num_channels'] = len(channels)
+
+    # convert to compression enum
+    comp = metadata['compression']
+    metadata['compression'] = ImageCodec.from_exr_code(comp.v)
+
+    if 'tiles' in metadata:
+        win = metadata['dataWindow']
+        metadata['tiles'] = _get_tile_info(
+            metadata['tiles'],
+            (win.max.x - win.min.x) + 1,
+            (win.max.y - win.min.y) + 1,
+        )
+
+    for key, val in metadata.items():
+        if isinstance(val, bytes):
+            metadata[key] = val.decode('utf-8')
+
+    return metadata
+
+
+def _read_blocks(
+    img,  # type: openexr.InputFile
+    metadata,  # type: dict
+    channels,  # type: List[str]
+    y0,  # type: int
+    y1,  # type: int
+    block_rows,  # type: int
+    dtype=None,  # type: Optional[DTypeLike]
+):
+    # type: (...) -> Iterator[Tuple[int, int, List[NDArray]]]
+    '''
+    Decodes given rows of an EXR file in blocks of scanlines. Blocks are
+    aligned to multiples of block_rows from the top of the data window. All
+    channels of a block are decoded in a single pass.
+
+    Args:
+        img (OpenEXR.InputFile): Input file.
+        metadata (dict): EXR header.
+        channels (list[str]): EXR channel names.
+        y0 (int): First row, relative to the data window.
+        y1 (int): Last row, exclusive.
+        block_rows (int): Number of rows per block.
+        dtype (numpy.dtype, optional): Dtype which OpenEXR converts pixels to
+            while decoding. Default: None (native channel dtypes).
+
+    Raises:
+        TypeError: If dtype has no EXR pixel type.
+
+    Yields:
+        tuple[int, int, list[numpy.NDArray]]: Start row, stop row and
+            (rows, W) array per channel.
+    '''
+    win = metadata['dataWindow']
+    x = (win.max.x - win.min.x) + 1
+    dtypes = [_get_dtype(metadata['channels'][c].type) for c in channels]
+    args = []
+    if dtype is not None:
+        args.append(_get_pixel_type(dtype))
+        dtypes = [dtype] * len(channels)
+
+    for block in range(y0 // block_rows, (y1 - 1) // block_rows + 1):
+        start = max(y0, block * block_rows)
+        stop = min(y1, (block + 1) * block_rows)
+        buffers = img.channels(
+            channels,
+            *args,
+            scanLine1=win.min.y + start,
+            scanLine2=win.min.y + stop - 1,
+        )
+        yield start, stop, [
+            np.frombuffer(b, d).reshape((stop - start, x))
+            for b, d in zip(buffers, dtypes)
+        ]
+
+
+def _decode_into(
+    img,  # type: openexr.InputFile
+    metadata,  # type: dict
+    channels,  # type: List[str]
+    planes,  # type: List[NDArray]
+    box,  # type: Tuple[int, int, int, int]
+    dtype=None,  # type: Optional[DTypeLike]
+):
+    # type: (...) -> None
+    '''
+    Decodes given channels in blocks of scanlines straight into given arrays,
+    so that only one block of channel buffers is alive at a time.
+
+    Args:
+        img (OpenEXR.InputFile): Input file.
+        metadata (dict): EXR header.
+        channels (list[str]): EXR channel names.
+        planes (list[numpy.NDArray]): (H, W) array, or view, per channel.
+        box (tuple[int]): (x0, y0, x1, y1) region, with exclusive ends.
+        dtype (numpy.dtype, optional): Dtype which OpenEXR converts pixels to
+            while decoding. Default: None (native channel dtypes).
+    '''
+    x0, y0, x1, y1 = box
+    blocks = _read_blocks(img, metadata, channels, y0, y1, _BLOCK_ROWS, dtype)
+    for start, stop, block in blocks:
+        for plane, temp in zip(planes, block):
+            plane[start - y0:stop - y0] = temp[:, x0:x1]
+
+
+def _check_thread_api():
+    # type: () -> None
+    '''
+    Ensures OpenEXR exposes its global thread pool, added in OpenEXR 3.3.
+
+    Raises:
+        RuntimeError: If OpenEXR is older than 3.3.
+    '''
+    if not hasattr(openexr, 'set_global_thread_count'):
+        msg = 'Configuring threads requires OpenEXR 3.3 or later.'
+        raise RuntimeError(msg)
+
+
+def get_threads():
+    # type: () -> int
+    '''
+    Gets the number of worker threads of the global OpenEXR thread pool, which
+    decompresses and compresses chunks in parallel.
+
+    Raises:
+        RuntimeError: If OpenEXR is older than 3.3.
+
+    Returns:
+        int: Number of threads. 0 is single threaded.
+    '''
+    _check_thread_api()
+    return openexr.global_thread_count()
+
+
+def set_threads(count=None):
+    # type: (Optional[int]) -> None
+    '''
+    Sets the number of worker threads of the global OpenEXR thread pool. The
+    pool is process wide, and is used by every subsequent read and write.
+    OpenEXR is single threaded until this is called. The pool decodes the
+    chunks of a single file in parallel, in native threads which do not need
+    the GIL, so it is the way to speed up reads of single large frames.
+
+    Processes forked after the pool has started may deadlock in OpenEXR, so
+    process pools should use the spawn or forkserver start method, or be
+    created before calling this.
+
+    Args:
+        count (int, optional): Number of threads. 0 is single threaded.
+            Default: None (CPU count).
+
+    Raises:
+        RuntimeError: If OpenEXR is older than 3.3.
+        ValueError: If count is negative.
+    '''
+    _check_thread_api()
+    if count is None:
+        count = os.cpu_count() or 1
+
+    if count < 0:
+        msg = f'Thread count must not be negative. {count} < 0.'
+        raise ValueError(msg)
+
+    openexr.set_global_thread_count(count)
+
+
+def _scope_threads(func):
+    # type: (_Function) -> _Function
+    '''
+    Decorates a read or write function with a threads argument, so that the
+    global OpenEXR thread pool is resized for the duration of the call, and
+    restored afterwards.
+
+    Args:
+        func (function): Function with a threads argument.
+
+    Returns:
+        function: Decorated function.
+    '''
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # type: (Any, Any) -> Any
+        threads = signature.bind(*args, **kwargs).arguments.get('threads')
+        if threads is None:
+            return func(*args, **kwargs)
+
+        previous = get_threads()
+        set_threads(threads)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            set_threads(previous)
+
+    return wrapper  # type: ignore
+
+
+def read_exr_metadata(fullpath):
+    # type: (Union[str, Path]) -> dict
+    '''
+    Reads the metadata of an OpenEXR image file without decoding its pixels.
+    Metadata is identical to that returned by read_exr.
+
+    Args:
+        fullpath (str or Path): Image file path.
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+
+    Returns:
+        dict: Metadata.
+    '''
+    img = _open_exr(fullpath)
+    metadata = img.header()
+    img.close()
+    return _clean_header(metadata, _get_channels(metadata))
+
+
+@_scope_threads
+def read_exr(
+    fullpath,  # type: Union[str, Path]
+    channels=None,  # type: Optional[Union[str, List[str]]]
+    region=None,  # type: Optional[Tuple[int, ...]]
+    out=None,  # type: Optional[NDArray]
+    layout='interleaved',  # type: str
+    dtype=None,  # type: Optional[DTypeLike]
+    threads=None,  # type: Optional[int]
+):
+    # type: (...) -> Tuple[NDArray, dict]
+    '''
+    Reads an OpenEXR image file.
+
+    Args:
+        fullpath (str or Path): Image file path.
+        channels (str or list[str], optional): Channel names or glob patterns,
+            such as "diffuse.*", to read. Only these channels are decoded.
+            Default: None (all channels).
+        region (tuple[int], optional): Region of interest, either a (y0, y1)
+            row range or a (x0, y0, x1, y1) box, relative to the data window
+            with exclusive ends. Only the scanlines covering the region are
+            decoded. For tiled images, only the rows of tiles covering the
+            region are decoded. Default: None (whole image).
+        out (numpy.NDArray, optional): Preallocated array to decode into,
+            which can be reused across frames. Pixels are cast to its dtype,
+            during decode if it is float16, float32 or uint32. Default: None.
+        layout (str, optional): Image layout. Options: interleaved (H, W, C),
+            planar (C, H, W). Planar channels are contiguous blocks.
+            Default: interleaved.
+        dtype (numpy.dtype, optional): Image dtype, either float16, float32
+            or uint32. OpenEXR converts pixels while decoding, so no extra
+            copy is made. Default: None (native dtype of channels).
+        threads (int, optional): Number of OpenEXR worker threads during
+            this call. The global thread pool is resized, and restored after
+            the call. Concurrent calls share the one pool, so they resize it
+            for each other. Default: None (current setting, see set_threads).
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+        ValueError: If a channel pattern matches no channels.
+        ValueError: If region is invalid.
+        ValueError: If out does not match the shape of the image.
+        ValueError: If layout is illegal.
+        TypeError: If dtype is not float16, float32 or uint32.
+        ValueError: If threads is negative.
+        RuntimeError: If threads is given and OpenEXR is older than 3.3.
+
+    Returns:
+        tuple[numpy.NDArray, dict]: Image and metadata.
+    '''
+    _check_layout(layout)
+
+    img = _open_exr(fullpath)
+    metadata = img.header()
+    win = metadata['dataWindow']
+    x = (win.max.x - win.min.x) + 1
+    y = (win.max.y - win.min.y) + 1
+
+    chans = _get_channels(metadata)
+    if channels is not None:
+        chans = _select_channels(chans, channels)
+
+    x0, y0, x1, y1 = _get_region(region, x, y)
+
+    if dtype is not None:
+        dtype = np.dtype(dtype)
+        _get_pixel_type(dtype)
+    elif out is not None:
+        # let OpenEXR convert pixels to the dtype of out, if it can
+        if out.dtype.name in ['float16', 'float32', 'uint32']:
+            dtype = out.dtype
+
+    dtypes = [_get_dtype(metadata['channels'][c].type) for c in chans]
+    shape = (y1 - y0, x1 - x0, len(chans))  # type: Tuple[int, ...]
+    if layout == 'planar':
+        shape = (len(chans), y1 - y0, x1 - x0)
+    if out is None:
+        out = np.empty(shape, dtype=dtype or np.result_type(*dtypes))
+    elif out.shape != shape:
+        msg = f'Output array shape {out.shape} does not match image shape '
+        msg += f'{shape}.'
+        raise ValueError(msg)
+
+    if layout == 'planar':
+        planes = list(out)
+    else:
+        planes = [out[:, :, i] for i in range(len(chans))]
+
+    _decode_into(img, metadata, chans, planes, (x0, y0, x1, y1), dtype)
+
+    metadata = _clean_header(metadata, chans)
+    return out, metadata
+
+
+@_scope_threads
+def read_exr_layers(
+    fullpath,  # type: Union[str, Path]
+    layers=None,  # type: Optional[Union[str, List[str]]]
+    region=None,  # type: Optional[Tuple[int, ...]]
+    dtype=None,  # type: Optional[DTypeLike]
+    threads=None,  # type: Optional[int]
+):
+    # type: (...) -> Tuple[Dict[str, NDArray], dict]
+    '''
+    Reads an OpenEXR image file as a dictionary of layers. The layer of a
+    channel is its name up to the last period, so diffuse.R belongs to the
+    diffuse layer. Channels without a period, such as R or Z, belong to the
+    default layer, named "".
+
+    Example:
+
+        >>> layers, metadata = read_exr_layers('/tmp/foo.exr', ['', 'N'])
+        >>> layers[''].shape  # r, g, b, a
+        (1080, 1920, 4)
+        >>> layers['n'].shape  # n.x, n.y, n.z
+        (1080, 1920, 3)
+
+    Args:
+        fullpath (str or Path): Image file path.
+        layers (str or list[str], optional): Layer names or glob patterns,
+            such as "light_*", to read. Only the channels of these layers are
+            decoded. Default: None (all layers).
+        region (tuple[int], optional): Region of interest, either a (y0, y1)
+            row range or a (x0, y0, x1, y1) box, relative to the data window
+            with exclusive ends. Default: None (whole image).
+        dtype (numpy.dtype, optional): Dtype of every layer, either float16,
+            float32 or uint32, converted to during decode.
+            Default: None (native dtype of channels).
+        threads (int, optional): Number of OpenEXR worker threads during
+            this call. The global thread pool is resized, and restored after
+            the call. Concurrent calls share the one pool, so they resize it
+            for each other. Default: None (current setting, see set_threads).
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+        ValueError: If a layer pattern matches no layers.
+        ValueError: If region is invalid.
+        TypeError: If dtype is not float16, float32 or uint32.
+        ValueError: If threads is negative.
+        RuntimeError: If threads is given and OpenEXR is older than 3.3.
+
+    Returns:
+        tuple[dict, dict]: Dictionary of lowercase layer name to (H, W, C)
+            image, and metadata. Metadata includes a layers dictionary of
+            layer name to channel names.
+    '''
+    img = _open_exr(fullpath)
+    metadata = img.header()
+    win = metadata['dataWindow']
+    x = (win.max.x - win.min.x) + 1
+    y = (win.max.y - win.min.y) + 1
+
+    groups = _get_layers(_get_channels(metadata))
+    if layers is not None:
+        groups = _select_layers(groups, layers)
+
+    x0, y0, x1, y1 = _get_region(region, x, y)
+
+    # each layer is decoded into its own array, at the precision of its own
+    # channels, but all layers are decoded in a single pass over the file
+    output = {}  # type: Dict[str, NDArray]
+    chans = []  # type: List[str]
+    planes = []  # type: List[NDArray]
+    for layer, lchans in groups.items():
+        dtypes = [_get_dtype(metadata['channels'][c].type) for c in lchans]
+        if dtype is not None:
+            dtypes = [dtype]
+        shape = (y1 - y0, x1 - x0, len(lchans))
+        out = np.empty(shape, dtype=np.result_type(*dtypes))
+        output[layer.lower()] = out
+        chans.extend(lchans)
+        planes.extend(out[:, :, i] for i in range(len(lchans)))
+
+    _decode_into(img, metadata, chans, planes, (x0, y0, x1, y1), dtype)
+
+    metadata = _clean_header(metadata, chans)
+    metadata['layers'] = {
+        k.lower(): [x.lower() for x in v] for k, v in groups.items()
+    }
+    return output, metadata
+
+
+@_scope_threads
+def read_exr_channels(
+    fullpath,  # type: Union[str, Path]
+    channels=None,  # type: Optional[Union[str, List[str]]]
+    region=None,  # type: Optional[Tuple[int, ...]]
+    threads=None,  # type: Optional[int]
+):
+    # type: (...) -> Tuple[Dict[str, NDArray], dict]
+    '''
+    Reads an OpenEXR image file as a dictionary of channels, each at its
+    native precision. Unlike read_exr, HALF channels are not promoted to
+    float32 when a file mixes HALF and FLOAT channels, so they take half the
+    memory and are not copied by the promotion.
+
+    Example:
+
+        >>> chans, metadata = read_exr_channels('/tmp/foo.exr')
+        >>> {k: v.dtype.name for k, v in chans.items()}
+        {'r': 'float16', 'g': 'float16', 'b': 'float16', 'z': 'float32'}
+
+    Args:
+        fullpath (str or Path): Image file path.
+        channels (str or list[str], optional): Channel names or glob patterns
+            to read. Default: None (all channels).
+        region (tuple[int], optional): Region of interest, either a (y0, y1)
+            row range or a (x0, y0, x1, y1) box, relative to the data window
+            with exclusive ends. Default: None (whole image).
+        threads (int, optional): Number of OpenEXR worker threads during
+            this call. The global thread pool is resized, and restored after
+            the call. Concurrent calls share the one pool, so they resize it
+            for each other. Default: None (current setting, see set_threads).
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+        ValueError: If a channel pattern matches no channels.
+        ValueError: If region is invalid.
+        ValueError: If threads is negative.
+        RuntimeError: If threads is given and OpenEXR is older than 3.3.
+
+    Returns:
+        tuple[dict, dict]: Dictionary of lowercase channel name to (H, W)
+            array, and metadata.
+    '''
+    img = _open_exr(fullpath)
+    metadata = img.header()
+    win = metadata['dataWindow']
+    x = (win.max.x - win.min.x) + 1
+    y = (win.max.y - win.min.y) + 1
+
+    chans = _get_channels(metadata)
+    if channels is not None:
+        chans = _select_channels(chans, channels)
+
+    x0, y0, x1, y1 = _get_region(region, x, y)
+
+    output = {}  # type: Dict[str, NDArray]
+    for chan in chans:
+        dtype = _get_dtype(metadata['channels'][chan].type)
+        output[chan.lower()] = np.empty((y1 - y0, x1 - x0), dtype=dtype)
+
+    _decode_into(img, metadata, chans, list(output.values()), (x0, y0, x1, y1))
+    metadata = _clean_header(metadata, chans)
+    return output, metadata
+
+
+def iter_exr_scanlines(
+    fullpath,  # type: Union[str, Path]
+    block_rows=_BLOCK_ROWS,  # type: int
+    channels=None,  # type: Optional[Union[str, List[str]]]
+    dtype=None,  # type: Optional[DTypeLike]
+):
+    # type: (...) -> Iterator[NDArray]
+    '''
+    Reads an OpenEXR image file as successive blocks of scanlines, so that
+    images can be processed in constant memory. Only one block is decoded at
+    a time. A block_rows that is a multiple of 256 never decodes a chunk twice.
+
+    Args:
+        fullpath (str or Path): Image file path.
+        block_rows (int, optional): Number of rows per block. The last block
+            may be shorter. Default: 256.
+        channels (str or list[str], optional): Channel names or glob patterns
+            to read. Default: None (all channels).
+        dtype (numpy.dtype, optional): Block dtype, either float16, float32
+            or uint32, converted to during decode. Default: None.
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+        ValueError: If block_rows is less than 1.
+        ValueError: If a channel pattern matches no channels.
+        TypeError: If dtype is not float16, float32 or uint32.
+
+    Yields:
+        numpy.NDArray: (block_rows, W, C) array.
+    '''
+    if block_rows < 1:
+        msg = f'Block rows must be at least 1. {block_rows} < 1.'
+        raise ValueError(msg)
+
+    img = _open_exr(fullpath)
+    metadata = img.header()
+    win = metadata['dataWindow']
+    y = (win.max.y - win.min.y) + 1
+
+    chans = _get_channels(metadata)
+    if channels is not None:
+        chans = _select_channels(chans, channels)
+
+    blocks = _read_blocks(img, metadata, chans, 0, y, block_rows, dtype)
+    for _, _, block in blocks:
+        yield np.stack(block, axis=2)
+
+
+def _get_header_end(data):
+    # type: (NDArray) -> Tuple[int, int]
+    '''
+    Parses the raw header of a single part EXR file.
+
+    Args:
+        data (numpy.NDArray): uint8 array of EXR file bytes.
+
+    Returns:
+        tuple[int]: Version flags and byte offset of the end of the header,
+            which is the start of the offset table.
+    '''
+    flags = int(data[4:8].view('<u4')[0]) & 0xFFFFFF00
+
+    # header is a sequence of name, type, size and value attributes, which is
+    # terminated by a null byte
+    pos = 8
+    while data[pos] != 0:
+        for _ in range(2):
+            pos += int(np.argmax(data[pos:pos + 256] == 0)) + 1
+        size = int(data[pos:pos + 4].view('<i4')[0])
+        pos += 4 + size
+    return flags, pos + 1
+
+
+def read_exr_tile(
+    fullpath,  # type: Union[str, Path]
+    tile_x,  # type: int
+    tile_y,  # type: int
+    channels=None,  # type: Optional[Union[str, List[str]]]
+):
+    # type: (...) -> Tuple[NDArray, dict]
+    '''
+    Reads a single tile of the full resolution level of a tiled OpenEXR image
+    file. Tiles on the right and bottom edges are clipped to the data window.
+    Tile size and counts are listed in the tiles entry of the metadata.
+
+    The OpenEXR Python bindings only read tiled files through the scanline
+    interface, which decodes every tile of the rows it reads. So reading one
+    tile costs as much as reading its whole row of tiles, num_x tiles across
+    the full image width, not a single tile. Viewers which fetch many tiles
+    should read whole rows of tiles with read_exr instead.
+
+    Args:
+        fullpath (str or Path): Image file path.
+        tile_x (int): Tile column index.
+        tile_y (int): Tile row index.
+        channels (str or list[str], optional): Channel names or glob patterns
+            to read. Default: None (all channels).
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+        ValueError: If image is not tiled.
+        ValueError: If tile index is out of range.
+
+    Returns:
+        tuple[numpy.NDArray, dict]: Tile and metadata.
+    '''
+    metadata = read_exr_metadata(fullpath)
+    if 'tiles' not in metadata:
+        raise ValueError(f'{fullpath} is not a tiled EXR file.')
+
+    info = metadata['tiles']
+    if not (0 <= tile_x < info['num_x'] and 0 <= tile_y < info['num_y']):
+        msg = f'Tile ({tile_x}, {tile_y}) is out of range. '
+        msg += f'Tile counts: ({info["num_x"]}, {info["num_y"]}).'
+        raise ValueError(msg)
+
+    win = metadata['dataWindow']
+    width = (win.max.x - win.min.x) + 1
+    height = (win.max.y - win.min.y) + 1
+    x0 = tile_x * info['x_size']
+    y0 = tile_y * info['y_size']
+    x1 = min(x0 + info['x_size'], width)
+    y1 = min(y0 + info['y_size'], height)
+    return read_exr(fullpath, channels=channels, region=(x0, y0, x1, y1))
+
+
+def _clean_part_header(header, channels):
+    # type: (dict, List[str]) -> dict
+    '''
+    Converts given OpenEXR File API part header into metadata returned by
+    multi-part read functions. Channels are lowercased, compression is
+    converted to an ImageCodec, storage type is converted to a string and tile
+    descriptions are converted to tile info dictionaries.
+
+    Args:
+        header (dict): OpenEXR File API part header.
+        channels (list[str]): EXR channel names in read order.
+
+    Returns:
+        dict: Metadata.
+    '''
+    metadata = dict(header)
+    metadata['channels'] = [x.lower() for x in channels]
+    metadata['num_channels'] = len(channels)
+
+    comp = metadata['compression']
+    metadata['compression'] = ImageCodec.from_exr_code(int(comp.value))
+    metadata['type'] = str(metadata['type']).split('.')[-1]
+
+    if 'tiles' in metadata:
+        x0, y0 = metadata['dataWindow'][0]
+        x1, y1 = metadata['dataWindow'][1]
+        metadata['tiles'] = _get_tile_info(
+            metadata['tiles'], int(x1 - x0) + 1, int(y1 - y0) + 1
+        )
+    return metadata
+
+
+def _get_part_channels(header):
+    # type: (dict) -> List[str]
+    '''
+    Gets EXR channel names of given OpenEXR File API part header in read
+    order.
+
+    Args:
+        header (dict): OpenEXR File API part header.
+
+    Returns:
+        list[str]: EXR channel names.
+    '''
+    channels = {x.name: x for x in header['channels']}
+    return _get_channels(dict(channels=channels))
+
+
+def _read_part_headers(fullpath):
+    # type: (Union[str, Path]) -> List[dict]
+    '''
+    Reads the OpenEXR File API header of every part of an OpenEXR image file.
+
+    Args:
+        fullpath (str or Path): Image file path.
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        RuntimeError: If OpenEXR is older than 3.3.
+
+    Returns:
+        list[dict]: Part headers.
+    '''
+    _check_file_api('Multi-part EXR reading')
+    fullpath = _get_exr_path(fullpath)
+    return [x.header for x in openexr.File(fullpath, header_only=True).parts]
+
+
+def read_exr_part_metadata(fullpath):
+    # type: (Union[str, Path]) -> List[dict]
+    '''
+    Reads the metadata of every part of an OpenEXR image file. Only headers
+    are read. Requires OpenEXR 3.3 or later.
+
+    Args:
+        fullpath (str or Path): Image file path.
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        RuntimeError: If OpenEXR is older than 3.3.
+
+    Returns:
+        list[dict]: Metadata of each part, in part order. Unnamed parts have
+            no name key.
+    '''
+    return [
+        _clean_part_header(x, _get_part_channels(x))
+        for x in _read_part_headers(fullpath)
+    ]
+
+
+def _get_part_index(headers, part):
+    # type: (List[dict], Union[int, str]) -> int
     '''
-    Reads an OpenEXR image file.
+    Gets the index of given part.
+
+    Args:
+        headers (list[dict]): Part headers.
+        part (int or str): Part index or name.
+
+    Raises:
+        ValueError: If part is not found.
+
+    Returns:
+        int: Part index.
+    '''
+    names = [x.get('name') for x in headers]
+    if isinstance(part, int) and 0 <= part < len(headers):
+        return part
+    if isinstance(part, str) and part in names:
+        return names.index(part)
+
+    msg = f'Part {part} not found. Legal parts: {names}.'
+    raise ValueError(msg)
+
+
+@_scope_threads
+def read_exr_parts(
+    fullpath,  # type: Union[str, Path]
+    parts=None,  # type: Optional[List[Union[int, str]]]
+    channels=None,  # type: Optional[Union[str, List[str]]]
+    threads=None,  # type: Optional[int]
+):
+    # type: (...) -> Dict[str, Tuple[NDArray, dict]]
+    '''
+    Reads given parts of a multi-part OpenEXR image file. Requires OpenEXR 3.3
+    or later.
+
+    The first part is decoded on its own when it is the only requested part.
+    The OpenEXR File API decodes every part of a file, so other parts are all
+    decoded in a single pass, and should be requested together.
 
     Args:
         fullpath (str or Path): Image file path.
+        parts (list[int or str], optional): Part indices or names.
+            Default: None (all parts).
+        channels (str or list[str], optional): Channel names or glob patterns
+            to read from each part. Default: None (all channels).
+        threads (int, optional): Number of OpenEXR worker threads during
+            this call. The global thread pool is resized, and restored after
+            the call. Concurrent calls share the one pool, so they resize it
+            for each other. Default: None (current setting, see set_threads).
 
     Raises:
         IOError: If given filepath is not an EXR file.
+        RuntimeError: If OpenEXR is older than 3.3.
+        ValueError: If a part is not found.
+        ValueError: If a channel pattern matches no channels of a part.
+        ValueError: If threads is negative.
 
     Returns:
-        tuple[numpy.NDArray, dict]: Image and metadata.
+        dict: Dictionary of part name, or index for unnamed parts, to image
+            and metadata.
+    '''
+    headers = _read_part_headers(fullpath)
+    fullpath = _get_exr_path(fullpath)
+
+    indices = list(range(len(headers)))
+    if parts is not None:
+        indices = []
+        for part in parts:
+            index = _get_part_index(headers, part)
+            if index not in indices:
+                indices.append(index)
+
+    file = None
+    if indices != [0]:
+        file = openexr.File(fullpath, separate_channels=True)
+
+    output = {}
+    for i in indices:
+        chans = _get_part_channels(headers[i])
+        if channels is not None:
+            chans = _select_channels(chans, channels)
+
+        if file is None:
+            img = _open_exr(fullpath, multipart=True)
+            header = img.header()
+            win = header['dataWindow']
+            x = (win.max.x - win.min.x) + 1
+            y = (win.max.y - win.min.y) + 1
+            dtypes = [_get_dtype(header['channels'][c].type) for c in chans]
+            image = np.empty((y, x, len(chans)), np.result_type(*dtypes))
+            planes = [image[:, :, j] for j in range(len(chans))]
+            _decode_into(img, header, chans, planes, (0, 0, x, y))
+        else:
+            pixels = file.parts[i].channels
+            image = np.dstack([pixels[x].pixels for x in chans])
+
+        metadata = _clean_part_header(headers[i], chans)
+        output[metadata.get('name', str(i))] = (image, metadata)
+    return output
+
+
+def read_exr_mmap(
+    fullpath,  # type: Union[str, Path]
+    channels=None,  # type: Optional[Union[str, List[str]]]
+):
+    # type: (...) -> Tuple[Dict[str, NDArray], dict]
+    '''
+    Memory maps an uncompressed scanline OpenEXR image file. Returns read only
+    (H, W) views over the pixel data on disk, so no pixels are decoded or
+    copied until they are accessed. Channels are returned separately, because
+    EXR files store them planar per scanline.
+
+    Args:
+        fullpath (str or Path): Image file path.
+        channels (str or list[str], optional): Channel names or glob patterns
+            to map. Default: None (all channels).
+
+    Raises:
+        IOError: If given filepath is not an EXR file.
+        ValueError: If file is multi-part. See read_exr_parts.
+        ValueError: If image is not written with ImageCodec.UNCOMPRESSED.
+        ValueError: If image is tiled, deep, multi-part or has subsampled
+            channels.
+        ValueError: If scanlines are not stored contiguously.
+
+    Returns:
+        tuple[dict, dict]: Dictionary of channel name to view, and metadata.
     '''
+    img = _open_exr(fullpath)
+    metadata = img.header()
+    img.close()
+
+    codec = ImageCodec.from_exr_code(metadata['compression'].v)
+    if codec is not ImageCodec.UNCOMPRESSED:
+        msg = 'Only EXR files written with ImageCodec.UNCOMPRESSED can be '
+        msg += f'memory mapped. Given codec: {codec.name}.'
+        raise ValueError(msg)
+
     if isinstance(fullpath, Path):
         fullpath = fullpath.absolute().as_posix()
+    data = np.memmap(fullpath, dtype=np.uint8, mode='r')
 
-    if not openexr.isOpenExrFile(fullpath):
-        msg = f'{fullpath} is not an EXR file.'
-        raise IOError(msg)
+    # 0x200 tiled, 0x800 deep, 0x1000 multi-part
+    flags, start = _get_header_end(data)
+    if flags & 0x1A00:
+        msg = 'Only single part scanline EXR files can be memory mapped.'
+        raise ValueError(msg)
 
-    img = openexr.InputFile(fullpath)
-    metadata = img.header()
     win = metadata['dataWindow']
     x = (win.max.x - win.min.x) + 1
     y = (win.max.y - win.min.y) + 1
 
-    # EXR headers store channel data in a map, so there can be no suuport for
-    # arbitrary channel order persistence.
-    image_stack = []
-    temp = sorted(metadata['channels'].keys())
-    channels = []
-    for chan in list('RGBA'):
-        if chan in temp:
-            channels.append(chan)
-            temp.remove(chan)
-    for chan in temp:
-        channels.append(chan)
-
-    for chan in channels:
-        data = metadata['channels'][chan]
-        temp_img = img.channel(chan, data.type)
-
-        # FLOAT is float32, HALF is float16
-        dtype = np.float32  # type: DTypeLike
-        if str(data.type) == 'HALF':
-            dtype = np.float16
+    # uncompressed chunks hold one scanline: y, byte size and then a row of
+    # pixels per channel, in alphabetical channel order
+    fields = [('y', '<i4'), ('size', '<i4')]  # type: List[tuple]
+    for chan, info in sorted(metadata['channels'].items()):
+        if info.xSampling != 1 or info.ySampling != 1:
+            msg = 'Only EXR files without subsampled channels can be memory '
+            msg += f'mapped. Channel {chan} is subsampled.'
+            raise ValueError(msg)
+        dtype = np.dtype(_get_dtype(info.type)).newbyteorder('<')
+        fields.append((chan, dtype, (x,)))
+    dtype = np.dtype(fields)
 
-        temp_img = np.frombuffer(temp_img, dtype).reshape((y, x))
-        image_stack.append(temp_img)
+    offsets = data[start:start + y * 8].view('<u8').astype(np.int64)
+    stride = dtype.itemsize
+    if y > 1 and offsets[1] < offsets[0]:
+        stride = -stride
+    expected = offsets[0] + stride * np.arange(y)
+    if not np.array_equal(offsets, expected):
+        msg = 'Only EXR files with contiguously stored scanlines can be memory '
+        msg += 'mapped.'
+        raise ValueError(msg)
 
-    image = np.dstack(image_stack)  # type: np.ndarray
-    metadata['channels'] = [x.lower() for x in channels]
-    metadata['num_channels'] = len(channels)
-
-    # convert to compression enum
-    comp = metadata['compression']
-    metadata['compression'] = ImageCodec.from_exr_code(comp.v)
+    rows = np.ndarray(
+        (y,), dtype=dtype, buffer=data, offset=int(offsets[0]), strides=(stride,)
+    )
 
-    for key, val in metadata.items():
-        if isinstance(val, bytes):
-            metadata[key] = val.decode('utf-8')
+    chans = _get_channels(metadata)
+    if channels is not None:
+        chans = _select_channels(chans, channels)
 
+    image = {c.lower(): rows[c] for c in chans}
+    metadata = _clean_header(metadata, chans)
     return image, metadata
 
 
@@ -122,6 +1301,8 @@ def clean_exr_metadadata(image, metadata):
         'pixelAspectRatio',
         'screenWindowCenter',
         'screenWindowWidth',
+        'tiles',
+        'type',
     ]
     intersect = set(metadata.keys()).intersection(forbidden)
     for key in intersect:
@@ -130,47 +1311,81 @@ def clean_exr_metadadata(image, metadata):
     return metadata
 
 
-def write_exr(fullpath, image, metadata, codec=ImageCodec.PIZ):
-    # type: (Union[str, Path], NDArray, dict, ImageCodec) -> None
+def _get_channel_dtypes(channels, dtype, pixel_type=None):
+    # type: (List[str], DTypeLike, Optional[Any]) -> List[np.dtype]
     '''
-    Writes image data and metadata as EXR to given file path.
+    Resolves the dtype pixels of each channel are written as.
 
     Args:
-        fullpath (str or Path): Path to EXR file.
-        image (numpy.NDArray): Image data.
-        metadata (dict): Dictionary of EXR metadata.
-        codec (ImageCodec, optional): Image codec. Default: ImageCodec.PIZ.
+        channels (list[str]): EXR channel names.
+        dtype (numpy.dtype): Image dtype.
+        pixel_type (numpy.dtype or dict, optional): Dtype of all channels, or
+            dictionary of channel name or glob pattern to dtype. Later
+            patterns override earlier ones. Unmatched channels keep image
+            dtype. Default: None.
 
     Raises:
-        TypeError: If image is not float16 or float32.
+        ValueError: If a pattern matches no channels.
+
+    Returns:
+        list[numpy.dtype]: Dtype per channel.
     '''
-    dtype = image.dtype
-    if dtype not in [np.float16, np.float32]:
-        msg = f'EXR cannot be saved with array of dtype: {dtype}.'
-        raise TypeError(msg)
+    if pixel_type is None:
+        return [np.dtype(dtype)] * len(channels)
+
+    if not isinstance(pixel_type, dict):
+        return [np.dtype(pixel_type)] * len(channels)
+
+    output = [np.dtype(dtype)] * len(channels)
+    for pattern, ptype in pixel_type.items():
+        for chan in _select_channels(channels, pattern):
+            output[channels.index(chan)] = np.dtype(ptype)
+    return output
+
 
-    # determine bit depth of EXR
-    ctype = imath.Channel(imath.PixelType(imath.PixelType.FLOAT))
-    if dtype == np.float16:
-        ctype = imath.Channel(imath.PixelType(imath.PixelType.HALF))
+def _create_header(
+    image,  # type: NDArray
+    metadata,  # type: dict
+    codec,  # type: ImageCodec
+    pixel_type=None,  # type: Optional[Any]
+):
+    # type: (...) -> Tuple[openexr.Header, List[str]]
+    '''
+    Creates an EXR header for given image and metadata.
+
+    Args:
+        image (numpy.NDArray): Image. Only its shape and dtype are used.
+        metadata (dict): Dictionary of EXR metadata.
+        codec (ImageCodec): Image codec.
+        pixel_type (numpy.dtype or dict, optional): Dtype of all channels, or
+            dictionary of channel name or glob pattern to dtype.
+            Default: None (image dtype).
 
+    Raises:
+        TypeError: If a channel is not float16, float32 or uint32.
+        ValueError: If a pixel type pattern matches no channels.
+
+    Returns:
+        tuple[OpenEXR.Header, list[str]]: EXR header and EXR channel names in
+            image channel order.
+    '''
     # ensure metadata is clean
     metadata = clean_exr_metadadata(image, metadata)
 
-    # ensure image has a channel axis
-    if len(image.shape) < 3:
-        shape = list(image.shape) + [1]
-        image = image.reshape(shape)
-
-    # create EXR data and channels objects
-    channels = {}
-    data = {}
-    for i, chan in enumerate(metadata['channels']):
+    # create EXR channels
+    channels = []
+    for chan in metadata['channels']:
         chan = str(chan)
         if chan in list('lrgba'):
             chan = chan.upper()
-        data[chan] = image[:, :, i].tobytes()
-        channels[chan] = ctype
+        channels.append(chan)
+
+    # determine bit depth of each EXR channel
+    dtypes = _get_channel_dtypes(channels, image.dtype, pixel_type)
+    for dtype in dtypes:
+        if dtype not in [np.float16, np.float32, np.uint32]:
+            msg = f'EXR cannot be saved with array of dtype: {dtype}.'
+            raise TypeError(msg)
 
     # create EXR header
     y, x = image.shape[:2]
@@ -182,12 +1397,672 @@ def write_exr(fullpath, image, metadata, codec=ImageCodec.PIZ):
             val = val.encode('utf-8')
         header[key] = val
 
-    header['channels'] = channels
+    header['channels'] = {
+        c: imath.Channel(_get_pixel_type(d)) for c, d in zip(channels, dtypes)
+    }
     header['compression'] = imath.Compression(codec.exr_code)
+    return header, channels
+
+
+def _pack_channels(
+    image,  # type: NDArray
+    channels,  # type: List[str]
+    dtypes=None,  # type: Optional[List[np.dtype]]
+):
+    # type: (...) -> Dict[str, NDArray]
+    '''
+    Packs the channels of given image into EXR pixel data. Channels are
+    gathered into contiguous planes with at most one copy of the image, and
+    handed to OpenEXR as arrays through the buffer protocol, rather than as
+    per channel bytes objects. Images which are already planar in memory are
+    not copied at all. Dtype conversion happens within the same copy.
+
+    Args:
+        image (numpy.NDArray): (H, W, C) image.
+        channels (list[str]): EXR channel names.
+        dtypes (list[numpy.dtype], optional): Pixel dtype per channel.
+            Default: None (image dtype).
+
+    Returns:
+        dict: Dictionary of EXR channel name to (H, W) contiguous array.
+    '''
+    if dtypes is None or len(set(dtypes)) < 2:
+        dtype = None if dtypes is None else dtypes[0]
+        planar = np.ascontiguousarray(np.moveaxis(image, 2, 0), dtype=dtype)
+        return {x: planar[i] for i, x in enumerate(channels)}
+
+    # mixed dtypes are converted one plane at a time
+    return {
+        x: np.ascontiguousarray(image[:, :, i], dtype=d)
+        for i, (x, d) in enumerate(zip(channels, dtypes))
+    }
+
+
+def _check_file_api(feature):
+    # type: (str) -> None
+    '''
+    Ensures the OpenEXR File API, added in OpenEXR 3.3, is available.
+
+    Args:
+        feature (str): Feature description for error message.
+
+    Raises:
+        RuntimeError: If OpenEXR is older than 3.3.
+    '''
+    if not hasattr(openexr, 'File'):
+        msg = f'{feature} requires OpenEXR 3.3 or later.'
+        raise RuntimeError(msg)
+
+
+def _create_file_header(image, metadata, codec):
+    # type: (NDArray, dict, ImageCodec) -> Dict[str, Any]
+    '''
+    Creates an OpenEXR File API header for given image and metadata. The File
+    API only supports metadata values of simple types.
+
+    Args:
+        image (numpy.NDArray): Image.
+        metadata (dict): Dictionary of EXR metadata.
+        codec (ImageCodec): Image codec.
+
+    Raises:
+        TypeError: If metadata contains unsupported value types.
+
+    Returns:
+        dict: Scanline image header, without channels.
+    '''
+    metadata = clean_exr_metadadata(image, metadata)
+    del metadata['channels']
+
+    header = {}  # type: Dict[str, Any]
+    for key, val in metadata.items():
+        if isinstance(val, list):
+            val = [str(x) for x in val]
+        elif not isinstance(val, (str, int, float)):
+            msg = f'Metadata value of {key} is not supported. '
+            msg += f'{type(val).__name__} is not str, int, float or list.'
+            raise TypeError(msg)
+        header[key] = val
+
+    header['type'] = openexr.scanlineimage
+    header['compression'] = openexr.Compression(codec.exr_code)
+    return header
+
+
+def _write_tiled(
+    fullpath,  # type: str
+    image,  # type: NDArray
+    metadata,  # type: dict
+    codec,  # type: ImageCodec
+    channels,  # type: List[str]
+    tile_size,  # type: Tuple[int, int]
+    dtypes=None,  # type: Optional[List[np.dtype]]
+):
+    # type: (...) -> None
+    '''
+    Writes a single level tiled EXR with the OpenEXR File API, as the
+    scanline OutputFile cannot write tiles.
+
+    Args:
+        fullpath (str): Path to EXR file.
+        image (numpy.NDArray): (H, W, C) image.
+        metadata (dict): Dictionary of EXR metadata.
+        codec (ImageCodec): Image codec.
+        channels (list[str]): EXR channel names.
+        tile_size (tuple[int]): (X, Y) tile size.
+        dtypes (list[numpy.dtype], optional): Pixel dtype per channel.
+            Default: None (image dtype).
+
+    Raises:
+        ValueError: If tile size is not positive.
+        TypeError: If metadata contains unsupported value types.
+        RuntimeError: If OpenEXR is older than 3.3.
+    '''
+    _check_file_api('Tiled EXR writing')
+
+    x_size, y_size = tile_size
+    if x_size < 1 or y_size < 1:
+        msg = f'Tile size must be positive. {tuple(tile_size)} < (1, 1).'
+        raise ValueError(msg)
+
+    header = _create_file_header(image, metadata, codec)
+    tiles = openexr.TileDescription()
+    tiles.xSize = x_size
+    tiles.ySize = y_size
+    tiles.mode = openexr.ONE_LEVEL
+    header['type'] = openexr.tiledimage
+    header['tiles'] = tiles
+
+    output = openexr.File(header, _pack_channels(image, channels, dtypes))
+    output.write(fullpath)
+
+
+def _downsample(image, axis, size):
+    # type: (NDArray, int, int) -> NDArray
+    '''
+    Halves given image along given axis with a box filter. Odd sizes are
+    cropped or edge padded to twice the target size.
+
+    Args:
+        image (numpy.NDArray): Image.
+        axis (int): Axis to downsample.
+        size (int): Target size along axis.
+
+    Returns:
+        numpy.NDArray: Downsampled image.
+    '''
+    length = image.shape[axis]
+    if size == length:
+        return image
+
+    if 2 * size < length:
+        crop = [slice(None)] * image.ndim
+        crop[axis] = slice(0, 2 * size)
+        image = image[tuple(crop)]
+    elif 2 * size > length:
+        pad = [(0, 0)] * image.ndim
+        pad[axis] = (0, 2 * size - length)
+        image = np.pad(image, pad, mode='edge')
+
+    shape = list(image.shape)
+    shape[axis:axis + 1] = [size, 2]
+    return image.reshape(shape).mean(axis=axis + 1, dtype=np.float32)
+
+
+def get_mip_levels(image, mode='mipmap', rounding='down'):
+    # type: (NDArray, str, str) -> Dict[Tuple[int, int], NDArray]
+    '''
+    Generates a mip-map or rip-map pyramid of given image with a 2x2 box
+    filter. Level sizes follow the OpenEXR level rounding rules, so that each
+    level can be written with write_exr and a tile size.
+
+    Modes:
+
+        * mipmap - levels (0, 0), (1, 1) ... down to 1x1
+        * ripmap - every combination of x and y levels
+
+    Args:
+        image (numpy.NDArray): (H, W) or (H, W, C) image.
+        mode (str, optional): Level mode. Options: mipmap, ripmap.
+            Default: mipmap.
+        rounding (str, optional): Level size rounding. Options: down, up.
+            Default: down.
+
+    Raises:
+        ValueError: If mode or rounding is illegal.
+
+    Returns:
+        dict: Dictionary of (X level, Y level) to image of image dtype.
+    '''
+    modes = ['mipmap', 'ripmap']
+    if mode not in modes:
+        msg = f'Illegal mode: {mode}. Legal modes: {modes}.'
+        raise ValueError(msg)
+
+    roundings = ['down', 'up']
+    if rounding not in roundings:
+        msg = f'Illegal rounding: {rounding}. Legal roundings: {roundings}.'
+        raise ValueError(msg)
+
+    height, width = image.shape[:2]
+    round_up = rounding == 'up'
+    levels_x = levels_y = _get_level_count(max(width, height), round_up)
+    if mode == 'ripmap':
+        levels_x = _get_level_count(width, round_up)
+        levels_y = _get_level_count(height, round_up)
+
+    def get_size(size, level):
+        # type: (int, int) -> int
+        if round_up:
+            return max(-(-size // 2 ** level), 1)
+        return max(size // 2 ** level, 1)
+
+    # downsample in float32, so that float16 levels do not accumulate error
+    dtype = image.dtype
+    output = {(0, 0): image}
+    level = image.astype(np.float32)  # type: NDArray
+    if mode == 'mipmap':
+        for i in range(1, levels_x):
+            level = _downsample(level, 0, get_size(height, i))
+            level = _downsample(level, 1, get_size(width, i))
+            output[(i, i)] = level.astype(dtype)
+        return output
+
+    column = level
+    for y in range(levels_y):
+        if y > 0:
+            column = _downsample(column, 0, get_size(height, y))
+        level = column
+        for x in range(levels_x):
+            if x > 0:
+                level = _downsample(level, 1, get_size(width, x))
+            output.setdefault((x, y), level.astype(dtype))
+    return output
+
+
+def _get_trial_sample(image, blocks=3):
+    # type: (NDArray, int) -> NDArray
+    '''
+    Samples evenly spaced blocks of scanlines from given image for codec
+    trials.
+
+    Args:
+        image (numpy.NDArray): (H, W, C) image.
+        blocks (int, optional): Number of blocks. Default: 3.
+
+    Returns:
+        numpy.NDArray: (rows, W, C) sample.
+    '''
+    height = image.shape[0]
+    if height <= blocks * _TRIAL_ROWS:
+        return image
+
+    starts = np.linspace(0, height - _TRIAL_ROWS, blocks).astype(int)
+    starts -= starts % _TRIAL_ROWS
+    return np.concatenate([image[x:x + _TRIAL_ROWS] for x in starts])
+
+
+def select_codec(
+    image,  # type: NDArray
+    metadata,  # type: dict
+    objective='size',  # type: str
+    size_budget=1.0,  # type: float
+    candidates=None,  # type: Optional[List[ImageCodec]]
+    pixel_type=None,  # type: Optional[Any]
+):
+    # type: (...) -> Tuple[ImageCodec, List[dict]]
+    '''
+    Selects the best codec for given image by trial compressing a few evenly
+    spaced blocks of its scanlines with every candidate codec.
+
+    Objectives:
+
+        * size - smallest file
+        * encode - fastest encode
+        * decode - fastest decode, among codecs whose file size is at most
+          size_budget times the uncompressed pixel size. If no codec is within
+          budget, the smallest is selected
+
+    Args:
+        image (numpy.NDArray): (H, W) or (H, W, C) image.
+        metadata (dict): Dictionary of EXR metadata.
+        objective (str, optional): Selection objective. Options: size, encode,
+            decode. Default: size.
+        size_budget (float, optional): Maximum file size for decode objective,
+            as a fraction of uncompressed pixel size. Default: 1.0.
+        candidates (list[ImageCodec], optional): Codecs to try.
+            Default: None (lossless codecs).
+        pixel_type (numpy.dtype or dict, optional): Dtype pixels are
+            written as. See write_exr. Default: None (image dtype).
+
+    Raises:
+        ValueError: If objective is illegal.
+        TypeError: If a channel is not float16, float32 or uint32.
+
+    Returns:
+        tuple[ImageCodec, list[dict]]: Selected codec and trial results.
+    '''
+    objectives = ['size', 'encode', 'decode']
+    if objective not in objectives:
+        msg = f'Illegal objective: {objective}. '
+        msg += f'Legal objectives: {objectives}.'
+        raise ValueError(msg)
+
+    header, channels = _create_header(
+        image, metadata, ImageCodec.PIZ, pixel_type
+    )
+    if candidates is None:
+        candidates = [
+            ImageCodec.PIZ,
+            ImageCodec.ZIP,
+            ImageCodec.ZIPS,
+            ImageCodec.RLE,
+            ImageCodec.UNCOMPRESSED,
+        ]
+        # PXR24 is only lossless for half and uint data
+        ptypes = [str(x.type) for x in header['channels'].values()]
+        if 'FLOAT' not in ptypes:
+            candidates.append(ImageCodec.PXR24)
+
+    if len(image.shape) < 3:
+        image = image.reshape(list(image.shape) + [1])
+    sample = _get_trial_sample(image)
+
+    # size of the pixels as written, which pixel type may convert
+    dtypes = _get_channel_dtypes(channels, image.dtype, pixel_type)
+    nbytes = sample.shape[0] * sample.shape[1] * sum(x.itemsize for x in dtypes)
+
+    trials = []  # type: List[dict]
+    with TemporaryDirectory() as root:
+        target = Path(root, 'trial.exr')
+        for codec in candidates:
+            start = time.perf_counter()
+            write_exr(
+                target, sample, metadata, codec=codec, pixel_type=pixel_type
+            )
+            encode = time.perf_counter() - start
+
+            decode = None
+            if objective == 'decode':
+                start = time.perf_counter()
+                read_exr(target)
+                decode = time.perf_counter() - start
+
+            trials.append(dict(
+                codec=codec,
+                ratio=os.path.getsize(target) / nbytes,
+                encode_seconds=encode,
+                decode_seconds=decode,
+            ))
+
+    smallest = min(trials, key=lambda x: x['ratio'])
+    if objective == 'encode':
+        best = min(trials, key=lambda x: x['encode_seconds'])
+    elif objective == 'decode':
+        legal = [x for x in trials if x['ratio'] <= size_budget]
+        best = smallest
+        if legal != []:
+            best = min(legal, key=lambda x: x['decode_seconds'])
+    else:
+        best = smallest
+    return best['codec'], trials
+
+
+@_scope_threads
+def write_exr(
+    fullpath,  # type: Union[str, Path]
+    image,  # type: NDArray
+    metadata,  # type: dict
+    codec=ImageCodec.PIZ,  # type: Union[ImageCodec, str]
+    layout='interleaved',  # type: str
+    objective='size',  # type: str
+    size_budget=1.0,  # type: float
+    tile_size=None,  # type: Optional[Tuple[int, int]]
+    pixel_type=None,  # type: Optional[Any]
+    threads=None,  # type: Optional[int]
+):
+    # type: (...) -> dict
+    '''
+    Writes image data and metadata as EXR to given file path.
+
+    Args:
+        fullpath (str or Path): Path to EXR file.
+        image (numpy.NDArray): Image data.
+        metadata (dict): Dictionary of EXR metadata.
+        codec (ImageCodec or str, optional): Image codec or "auto", which
+            selects a lossless codec with select_codec. Default: ImageCodec.PIZ.
+        layout (str, optional): Image layout. Options: interleaved (H, W, C),
+            planar (C, H, W). Contiguous planar images are written without
+            copying. Default: interleaved.
+        objective (str, optional): Auto codec objective. Options: size,
+            encode, decode. Default: size.
+        size_budget (float, optional): Auto codec size budget for decode
+            objective. Default: 1.0.
+        tile_size (tuple[int], optional): (X, Y) tile size. If given, a
+            single level tiled EXR is written. Requires OpenEXR 3.3 or later.
+            Default: None.
+        pixel_type (numpy.dtype or dict, optional): Dtype pixels are written
+            as, either float16 (HALF), float32 (FLOAT) or uint32 (UINT), or
+            a dictionary of channel name or glob pattern to dtype, such as
+            {'[rgba]': 'float16', 'z': 'float32', 'id': 'uint32'}. Later
+            patterns override earlier ones, and unmatched channels keep the
+            image dtype. Image data of any dtype is converted while it is
+            packed into channels, without an extra copy. Default: None
+            (image dtype).
+        threads (int, optional): Number of OpenEXR worker threads during
+            this call. The global thread pool is resized, and restored after
+            the call. Concurrent calls share the one pool, so they resize it
+            for each other. Default: None (current setting, see set_threads).
+
+    Raises:
+        TypeError: If a channel is not float16, float32 or uint32.
+        ValueError: If a pixel type pattern matches no channels.
+        ValueError: If layout is illegal.
+        ValueError: If codec is a string other than "auto".
+        ValueError: If tile size is not positive.
+        TypeError: If tiled metadata contains unsupported value types.
+        RuntimeError: If tile size is given and OpenEXR is older than 3.3.
+        ValueError: If threads is negative.
+        RuntimeError: If threads is given and OpenEXR is older than 3.3.
+
+    Returns:
+        dict: Write info. Includes codec and, for auto codec, objective and
+            trials.
+    '''
+    _check_layout(layout)
+    if layout == 'planar' and len(image.shape) > 2:
+        image = np.moveaxis(image, 0, 2)
+
+    info = {}  # type: dict
+    if isinstance(codec, str):
+        if codec != 'auto':
+            msg = f'Illegal codec: {codec}. Codec must be an ImageCodec or '
+            msg += '"auto".'
+            raise ValueError(msg)
+
+        codec, trials = select_codec(
+            image, metadata, objective=objective, size_budget=size_budget,
+            pixel_type=pixel_type,
+        )
+        info['objective'] = objective
+        info['trials'] = trials
+    info['codec'] = codec
+
+    header, channels = _create_header(image, metadata, codec, pixel_type)
+    dtypes = [
+        np.dtype(_get_dtype(header['channels'][x].type)) for x in channels
+    ]
+
+    # ensure image has a channel axis
+    if len(image.shape) < 3:
+        shape = list(image.shape) + [1]
+        image = image.reshape(shape)
 
     # write EXR data
     if isinstance(fullpath, Path):
         fullpath = fullpath.absolute().as_posix()
 
+    if tile_size is not None:
+        info['tile_size'] = tuple(tile_size)
+        _write_tiled(
+            fullpath, image, metadata, codec, channels, tile_size, dtypes
+        )
+        return info
+
     output = openexr.OutputFile(fullpath, header)
-    output.writePixels(data)
+    output.writePixels(_pack_channels(image, channels, dtypes))
+    output.close()
+    return info
+
+
+@_scope_threads
+def write_exr_parts(
+    fullpath,  # type: Union[str, Path]
+    parts,  # type: Dict[str, Tuple[NDArray, dict]]
+    codec=ImageCodec.PIZ,  # type: ImageCodec
+    threads=None,  # type: Optional[int]
+):
+    # type: (...) -> None
+    '''
+    Writes a multi-part EXR to given file path. Parts may differ in size and
+    share a display window covering the largest part. Requires OpenEXR 3.3 or
+    later.
+
+    Args:
+        fullpath (str or Path): Path to EXR file.
+        parts (dict): Dictionary of part name to image and metadata.
+        codec (ImageCodec, optional): Image codec of every part.
+            Default: ImageCodec.PIZ.
+        threads (int, optional): Number of OpenEXR worker threads during
+            this call. The global thread pool is resized, and restored after
+            the call. Concurrent calls share the one pool, so they resize it
+            for each other. Default: None (current setting, see set_threads).
+
+    Raises:
+        RuntimeError: If OpenEXR is older than 3.3.
+        ValueError: If no parts are given.
+        TypeError: If an image is not float16, float32 or uint32.
+        TypeError: If metadata contains unsupported value types.
+        ValueError: If threads is negative.
+    '''
+    _check_file_api('Multi-part EXR writing')
+
+    if len(parts) == 0:
+        msg = 'No parts given.'
+        raise ValueError(msg)
+
+    # parts must share a display window, so it covers the largest part
+    height = max(x.shape[0] for x, _ in parts.values())
+    width = max(x.shape[1] for x, _ in parts.values())
+    window = (
+        np.array([0, 0], dtype=np.int32),
+        np.array([width - 1, height - 1], dtype=np.int32),
+    )
+
+    output = []
+    for name, (image, metadata) in parts.items():
+        _, channels = _create_header(image, metadata, codec)
+        if len(image.shape) < 3:
+            image = image.reshape(list(image.shape) + [1])
+
+        header = _create_file_header(image, metadata, codec)
+        header.pop('name', None)
+        header['displayWindow'] = window
+        pixels = _pack_channels(image, channels)
+        output.append(openexr.Part(header, pixels, name))
+
+    if isinstance(fullpath, Path):
+        fullpath = fullpath.absolute().as_posix()
+    openexr.File(output).write(fullpath)
+
+
+class ExrWriter:
+    '''
+    Writes an OpenEXR image file incrementally, as successive blocks of rows.
+    Only the current block needs to be held in memory. A file which is closed
+    before every row has been written, or after an error, is removed.
+
+    Example:
+
+        >>> with ExrWriter('/tmp/foo.exr', (8192, 16384, 3), {}) as writer:
+        >>>     for block in generate_rows(block_rows=256):
+        >>>         writer.write(block)
+    '''
+    def __init__(
+        self,
+        fullpath,  # type: Union[str, Path]
+        shape,  # type: Tuple[int, ...]
+        metadata,  # type: dict
+        dtype=np.float16,  # type: DTypeLike
+        codec=ImageCodec.PIZ,  # type: ImageCodec
+    ):
+        # type: (...) -> None
+        '''
+        Args:
+            fullpath (str or Path): Path to EXR file.
+            shape (tuple[int]): (H, W) or (H, W, C) shape of full image.
+            metadata (dict): Dictionary of EXR metadata.
+            dtype (numpy.dtype, optional): Image dtype. Default: float16.
+            codec (ImageCodec, optional): Image codec.
+                Default: ImageCodec.PIZ.
+
+        Raises:
+            TypeError: If dtype is not float16, float32 or uint32.
+        '''
+        # header only needs image shape and dtype, so use a zero copy stand-in
+        template = np.broadcast_to(np.zeros((), dtype=dtype), shape)
+        header, self._channels = _create_header(template, metadata, codec)
+
+        self.height = shape[0]  # type: int
+        self.width = shape[1]  # type: int
+        self.dtype = template.dtype
+        self.rows_written = 0
+
+        if isinstance(fullpath, Path):
+            fullpath = fullpath.absolute().as_posix()
+        self.fullpath = fullpath  # type: str
+        self._output = openexr.OutputFile(fullpath, header)
+        self._closed = False
+
+    def __enter__(self):
+        # type: () -> ExrWriter
+        return self
+
+    def __exit__(self, exc_type, *args):
+        # type: (Any, Any) -> None
+        # an error in the with block propagates without being masked by the
+        # incomplete image error of close
+        if exc_type is not None:
+            self._discard()
+            return
+        self.close()
+
+    def write(self, block):
+        # type: (NDArray) -> None
+        '''
+        Writes the next block of rows.
+
+        Args:
+            block (numpy.NDArray): (rows, W) or (rows, W, C) image block.
+
+        Raises:
+            TypeError: If block dtype does not match writer dtype.
+            ValueError: If block width or channels do not match image shape.
+            ValueError: If block exceeds image height.
+        '''
+        if block.dtype != self.dtype:
+            msg = f'Block dtype {block.dtype} does not match writer dtype '
+            msg += f'{self.dtype}.'
+            raise TypeError(msg)
+
+        if len(block.shape) < 3:
+            block = block.reshape(list(block.shape) + [1])
+
+        expected = (self.width, len(self._channels))
+        if block.shape[1:] != expected:
+            msg = f'Block shape {block.shape} does not match image width and '
+            msg += f'channels: {expected}.'
+            raise ValueError(msg)
+
+        rows = block.shape[0]
+        if self.rows_written + rows > self.height:
+            msg = f'Block of {rows} rows exceeds image height. '
+            msg += f'{self.rows_written} + {rows} > {self.height}.'
+            raise ValueError(msg)
+
+        if rows == 0:
+            return
+
+        self._output.writePixels(_pack_channels(block, self._channels), rows)
+        self.rows_written += rows
+
+    def _discard(self):
+        # type: () -> None
+        '''
+        Closes and removes the file, which cannot be read unless every row
+        has been written.
+        '''
+        if not self._closed:
+            self._closed = True
+            self._output.close()
+        if os.path.exists(self.fullpath):
+            os.remove(self.fullpath)
+
+    def close(self):
+        # type: () -> None
+        '''
+        Closes the file. A file with rows that have not been written cannot be
+        read, so it is removed.
+
+        Raises:
+            ValueError: If not every row has been written.
+        '''
+        if self.rows_written < self.height:
+            self._discard()
+            msg = f'Image is incomplete. {self.rows_written} of '
+            msg += f'{self.height} rows written. {self.fullpath} removed.'
+            raise ValueError(msg)
+
+        if not self._closed:
+            self._closed = True
+            self._output.close()
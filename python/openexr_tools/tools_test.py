@@ -21,6 +21,23 @@ def write_png(self, root):
             .save(target)
         return target
 
+    def write_tiled_exr(self, root, image, tile_size=(4, 3)):
+        td = openexr.TileDescription()
+        td.xSize, td.ySize = tile_size
+        td.mode = openexr.ONE_LEVEL
+        header = dict(
+            compression=openexr.ZIP_COMPRESSION,
+            type=openexr.tiledimage,
+            tiles=td,
+        )
+        channels = {
+            c: np.ascontiguousarray(image[:, :, i])
+            for i, c in enumerate('RGBA')
+        }
+        target = Path(root, 'tiled.exr').as_posix()
+        openexr.File(header, channels).write(target)
+        return target
+
     def write_exr(self, root, dtype, channels=list('RGBA')):
         ctype = imath.Channel(imath.PixelType(imath.PixelType.FLOAT))
         if dtype == np.float16:
@@ -82,6 +99,666 @@ def test_read_exr_channels(self):
             expected = list('rgba') + sorted(['foo', 'bar', 'baz'])
             self.assertEqual(metadata['channels'], expected)
 
+    def test_read_exr_channel_subset(self):
+        with TemporaryDirectory() as root:
+            channels = list('rgba') + ['diffuse.r', 'diffuse.g', 'spec.r']
+            src = self.write_exr(root, np.float16, channels=channels)
+
+            image, metadata = tools.read_exr(src, channels=['b', 'r'])
+            self.assertEqual(image.shape, (5, 10, 2))
+            self.assertEqual(metadata['channels'], ['b', 'r'])
+            self.assertEqual(metadata['num_channels'], 2)
+
+            image, metadata = tools.read_exr(src, channels='diffuse.*')
+            self.assertEqual(image.shape, (5, 10, 2))
+            self.assertEqual(metadata['channels'], ['diffuse.g', 'diffuse.r'])
+
+            _, metadata = tools.read_exr(src, channels=['A', '*.r', 'a'])
+            expected = ['a', 'diffuse.r', 'spec.r']
+            self.assertEqual(metadata['channels'], expected)
+
+    def test_read_exr_channel_subset_error(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root, np.float16)
+            expected = 'No channels found matching pattern: z. '
+            expected += r"Legal channels: \['r', 'g', 'b', 'a'\]."
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr(src, channels=['r', 'z'])
+
+    def test_read_exr_region(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.arange(200, dtype=np.float32).reshape((10, 5, 4))
+            tools.write_exr(target, expected, dict(channels=list('rgba')))
+
+            result, _ = tools.read_exr(target, region=(2, 5))
+            self.assertEqual(result.shape, (3, 5, 4))
+            np.testing.assert_array_equal(result, expected[2:5])
+
+            result, _ = tools.read_exr(target, region=(1, 2, 4, 9))
+            self.assertEqual(result.shape, (7, 3, 4))
+            np.testing.assert_array_equal(result, expected[2:9, 1:4])
+
+            result, _ = tools.read_exr(
+                target, channels=['g'], region=(0, 9, 5, 10)
+            )
+            self.assertEqual(result.shape, (1, 5, 1))
+            np.testing.assert_array_equal(result, expected[9:10, :, 1:2])
+
+    def test_read_exr_region_error(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            tools.write_exr(target, np.zeros((10, 5, 4), np.float16), {})
+
+            expected = 'Region must be a .* Given region: .1, 2, 3.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr(target, region=(1, 2, 3))
+
+            expected = r'Region \(0, 11\) is empty or exceeds image bounds: '
+            expected += r'\(0, 0, 5, 10\).'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr(target, region=(0, 11))
+
+            with self.assertRaisesRegex(ValueError, 'is empty'):
+                tools.read_exr(target, region=(3, 3))
+
+    def test_read_exr_out(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(600, 7, 3).astype(np.float16)
+            tools.write_exr(target, expected, dict(channels=list('rgb')))
+
+            out = np.zeros((600, 7, 3), dtype=np.float16)
+            result, _ = tools.read_exr(target, out=out)
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(result, expected)
+
+            out = np.zeros((300, 2, 2), dtype=np.float32)
+            result, _ = tools.read_exr(
+                target, channels=['g', 'b'], region=(3, 200, 5, 500), out=out
+            )
+            self.assertIs(result, out)
+            self.assertEqual(result.dtype, np.float32)
+            np.testing.assert_array_equal(result, expected[200:500, 3:5, 1:])
+
+    def test_read_exr_out_error(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root, np.float16)
+            out = np.zeros((5, 10, 3), dtype=np.float16)
+            expected = r'Output array shape \(5, 10, 3\) does not match '
+            expected += r'image shape \(5, 10, 4\).'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr(src, out=out)
+
+    def test_read_exr_planar(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(10, 5, 3).astype(np.float16)
+            tools.write_exr(target, expected, dict(channels=list('rgb')))
+
+            result, _ = tools.read_exr(target, layout='planar')
+            self.assertEqual(result.shape, (3, 10, 5))
+            self.assertTrue(result.flags.c_contiguous)
+            np.testing.assert_array_equal(result, np.moveaxis(expected, 2, 0))
+
+            out = np.zeros((2, 3, 5), dtype=np.float16)
+            result, _ = tools.read_exr(
+                target, channels=['b', 'g'], region=(2, 5), layout='planar',
+                out=out
+            )
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(result[0], expected[2:5, :, 2])
+            np.testing.assert_array_equal(result[1], expected[2:5, :, 1])
+
+            # more channels than columns
+            result, _ = tools.read_exr(
+                target, region=(3, 0, 5, 10), layout='planar'
+            )
+            self.assertEqual(result.shape, (3, 10, 2))
+            np.testing.assert_array_equal(
+                result, np.moveaxis(expected[:, 3:5], 2, 0)
+            )
+
+    def test_read_exr_dtype(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(300, 10, 3).astype(np.float16)
+            tools.write_exr(target, image, dict(channels=list('rgb')))
+
+            result, _ = tools.read_exr(target, dtype=np.float32)
+            self.assertEqual(result.dtype, np.float32)
+            np.testing.assert_array_equal(result, image.astype(np.float32))
+
+            result, _ = tools.read_exr(
+                target, dtype='float32', region=(2, 5), layout='planar'
+            )
+            self.assertEqual(result.dtype, np.float32)
+            np.testing.assert_array_equal(
+                result, np.moveaxis(image[2:5], 2, 0).astype(np.float32)
+            )
+
+            # out dtype is decoded natively
+            out = np.zeros((300, 10, 3), dtype=np.float32)
+            result, _ = tools.read_exr(target, out=out)
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(result, image.astype(np.float32))
+
+            expected = 'No EXR pixel type for dtype: float64. '
+            expected += r"Legal dtypes: \['float16', 'float32', 'uint32'\]."
+            with self.assertRaisesRegex(TypeError, expected):
+                tools.read_exr(target, dtype=np.float64)
+
+            blocks = list(tools.iter_exr_scanlines(target, dtype=np.float32))
+            self.assertEqual(blocks[0].dtype, np.float32)
+            np.testing.assert_array_equal(
+                np.concatenate(blocks), image.astype(np.float32)
+            )
+
+            layers, _ = tools.read_exr_layers(target, dtype=np.float32)
+            self.assertEqual(layers[''].dtype, np.float32)
+
+    def test_read_exr_layout_error(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root, np.float16)
+            expected = 'Illegal layout: foo. Legal layouts: interleaved, planar.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr(src, layout='foo')
+
+    def test_read_exr_metadata(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.zeros((10, 5, 4), dtype=np.float16)
+            metadata = dict(channels=list('bgar'), foo='bar')
+            tools.write_exr(target, image, metadata, codec=ImageCodec.ZIP)
+
+            result = tools.read_exr_metadata(target)
+            _, expected = tools.read_exr(target)
+            self.assertEqual(result.keys(), expected.keys())
+            self.assertEqual(result['channels'], list('rgba'))
+            self.assertEqual(result['num_channels'], 4)
+            self.assertEqual(result['compression'], ImageCodec.ZIP)
+            self.assertEqual(result['foo'], 'bar')
+
+    def test_read_exr_metadata_error(self):
+        with TemporaryDirectory() as root:
+            src = self.write_png(root)
+            expected = f'{src} is not an EXR file.'
+            with self.assertRaisesRegex(IOError, expected):
+                tools.read_exr_metadata(src)
+
+    def test_get_layers(self):
+        channels = [
+            'A', 'B', 'G', 'R', 'Z', 'N.z', 'N.x', 'N.y',
+            'diffuse.B', 'diffuse.G', 'diffuse.R', 'light.key.R',
+            'spec.b', 'spec.r',
+        ]
+        result = tools._get_layers(channels)
+        expected = {
+            '': ['R', 'G', 'B', 'A', 'Z'],
+            'N': ['N.x', 'N.y', 'N.z'],
+            'diffuse': ['diffuse.R', 'diffuse.G', 'diffuse.B'],
+            'light.key': ['light.key.R'],
+            'spec': ['spec.r', 'spec.b'],
+        }
+        self.assertEqual(result, expected)
+        self.assertEqual(list(result.keys()), list(expected.keys()))
+
+    def test_select_layers(self):
+        layers = tools._get_layers(['R', 'N.x', 'light1.R', 'light2.R'])
+        result = tools._select_layers(layers, ['light*', 'n', 'light1'])
+        self.assertEqual(list(result.keys()), ['light1', 'light2', 'N'])
+
+        result = tools._select_layers(layers, '')
+        self.assertEqual(result, {'': ['R']})
+
+        expected = 'No layers found matching pattern: foo. '
+        expected += r"Legal layers: \['', 'n', 'light1', 'light2'\]."
+        with self.assertRaisesRegex(ValueError, expected):
+            tools._select_layers(layers, 'foo')
+
+    def test_read_exr_layers(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(5, 10, 6).astype(np.float16)
+            channels = ['r', 'g', 'diffuse.b', 'diffuse.g', 'diffuse.r', 'z']
+            tools.write_exr(target, image, dict(channels=channels))
+
+            layers, metadata = tools.read_exr_layers(target)
+            self.assertEqual(list(layers.keys()), ['', 'diffuse'])
+            np.testing.assert_array_equal(layers[''], image[:, :, [0, 1, 5]])
+            np.testing.assert_array_equal(
+                layers['diffuse'], image[:, :, [4, 3, 2]]
+            )
+            self.assertEqual(
+                metadata['layers'],
+                {
+                    '': ['r', 'g', 'z'],
+                    'diffuse': ['diffuse.r', 'diffuse.g', 'diffuse.b'],
+                }
+            )
+
+            # only requested layers are decoded
+            layers, metadata = tools.read_exr_layers(
+                target, 'DIFFUSE', region=(1, 2, 4, 5)
+            )
+            self.assertEqual(list(layers.keys()), ['diffuse'])
+            np.testing.assert_array_equal(
+                layers['diffuse'], image[2:5, 1:4][:, :, [4, 3, 2]]
+            )
+            expected = ['diffuse.r', 'diffuse.g', 'diffuse.b']
+            self.assertEqual(metadata['channels'], expected)
+            self.assertEqual(metadata['num_channels'], 3)
+
+    def test_read_exr_layers_errors(self):
+        with TemporaryDirectory() as root:
+            src = Path(root, 'foo.exr')
+            with self.assertRaisesRegex(IOError, 'foo.exr is not an EXR file.'):
+                tools.read_exr_layers(src)
+
+            src = self.write_exr(root, np.float16)
+            expected = 'No layers found matching pattern: foo.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_layers(src, 'foo')
+
+    def test_read_exr_channels_native(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(300, 10, 5)
+            metadata = dict(channels=list('rgbaz'))
+            pixel_type = {'*': 'float16', 'z': 'float32', 'a': 'uint32'}
+            tools.write_exr(target, image, metadata, pixel_type=pixel_type)
+
+            result, metadata = tools.read_exr_channels(target)
+            self.assertEqual(list(result.keys()), list('rgbaz'))
+            self.assertEqual(metadata['channels'], list('rgbaz'))
+            dtypes = {k: v.dtype.name for k, v in result.items()}
+            expected = dict(
+                r='float16', g='float16', b='float16', a='uint32', z='float32'
+            )
+            self.assertEqual(dtypes, expected)
+            np.testing.assert_array_equal(
+                result['r'], image[:, :, 0].astype(np.float16)
+            )
+            np.testing.assert_array_equal(
+                result['z'], image[:, :, 4].astype(np.float32)
+            )
+            self.assertTrue(result['r'].flags.writeable)
+
+            result, metadata = tools.read_exr_channels(
+                target, channels=['Z', 'g'], region=(2, 257, 5, 300)
+            )
+            self.assertEqual(list(result.keys()), ['z', 'g'])
+            self.assertEqual(metadata['channels'], ['z', 'g'])
+            self.assertEqual(result['z'].shape, (43, 3))
+            np.testing.assert_array_equal(
+                result['z'], image[257:, 2:5, 4].astype(np.float32)
+            )
+
+    def test_read_exr_channels_native_errors(self):
+        with TemporaryDirectory() as root:
+            src = Path(root, 'foo.exr')
+            with self.assertRaisesRegex(IOError, 'foo.exr is not an EXR file.'):
+                tools.read_exr_channels(src)
+
+            src = self.write_exr(root, np.float16)
+            expected = 'No channels found matching pattern: foo.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_channels(src, 'foo')
+
+    def test_iter_exr_scanlines(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(10, 5, 4).astype(np.float32)
+            tools.write_exr(target, expected, dict(channels=list('rgba')))
+
+            result = list(tools.iter_exr_scanlines(target, block_rows=4))
+            self.assertEqual([x.shape for x in result], [
+                (4, 5, 4), (4, 5, 4), (2, 5, 4)
+            ])
+            np.testing.assert_array_equal(np.concatenate(result), expected)
+
+            result = list(tools.iter_exr_scanlines(target, channels=['b']))
+            self.assertEqual(len(result), 1)
+            np.testing.assert_array_equal(result[0], expected[:, :, 2:3])
+
+    def test_iter_exr_scanlines_error(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root, np.float16)
+            expected = 'Block rows must be at least 1. 0 < 1.'
+            with self.assertRaisesRegex(ValueError, expected):
+                next(tools.iter_exr_scanlines(src, block_rows=0))
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_read_exr_tiled(self):
+        with TemporaryDirectory() as root:
+            expected = np.random.rand(10, 9, 4).astype(np.float16)
+            src = self.write_tiled_exr(root, expected)
+
+            result, metadata = tools.read_exr(src)
+            np.testing.assert_array_equal(result, expected)
+            self.assertEqual(metadata['tiles'], dict(
+                x_size=4, y_size=3, mode='ONE_LEVEL', rounding='ROUND_DOWN',
+                num_x=3, num_y=4, levels_x=1, levels_y=1,
+            ))
+
+            result, _ = tools.read_exr(src, region=(2, 4, 7, 8))
+            np.testing.assert_array_equal(result, expected[4:8, 2:7])
+
+            # tiled metadata can be written to scanline files
+            target = Path(root, 'scanline.exr')
+            tools.write_exr(target, result, metadata)
+            _, metadata = tools.read_exr(target)
+            self.assertNotIn('tiles', metadata)
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_read_exr_tile(self):
+        with TemporaryDirectory() as root:
+            expected = np.random.rand(10, 9, 4).astype(np.float16)
+            src = self.write_tiled_exr(root, expected)
+
+            result, _ = tools.read_exr_tile(src, 1, 2)
+            np.testing.assert_array_equal(result, expected[6:9, 4:8])
+
+            # edge tile is clipped
+            result, metadata = tools.read_exr_tile(src, 2, 3, channels=['g'])
+            self.assertEqual(result.shape, (1, 1, 1))
+            np.testing.assert_array_equal(result, expected[9:, 8:, 1:2])
+            self.assertEqual(metadata['channels'], ['g'])
+
+            expected = r'Tile \(3, 0\) is out of range. Tile counts: \(3, 4\).'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_tile(src, 3, 0)
+
+    def test_read_exr_tile_error(self):
+        with TemporaryDirectory() as root:
+            src = self.write_exr(root, np.float16)
+            expected = f'{src} is not a tiled EXR file.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_tile(src, 0, 0)
+
+    def test_get_tile_info(self):
+        tiles = imath.TileDescription(
+            16, 8, imath.LevelMode(imath.LevelMode.MIPMAP_LEVELS)
+        )
+        result = tools._get_tile_info(tiles, 100, 37)
+        self.assertEqual(result, dict(
+            x_size=16, y_size=8, mode='MIPMAP_LEVELS', rounding='ROUND_DOWN',
+            num_x=7, num_y=5, levels_x=7, levels_y=7,
+        ))
+
+        tiles = imath.TileDescription(
+            16, 8, imath.LevelMode(imath.LevelMode.RIPMAP_LEVELS),
+            imath.LevelRoundingMode(imath.LevelRoundingMode.ROUND_UP),
+        )
+        result = tools._get_tile_info(tiles, 100, 37)
+        self.assertEqual(result['levels_x'], 8)
+        self.assertEqual(result['levels_y'], 7)
+
+    def write_exr_parts(self, root):
+        beauty = np.random.rand(6, 5, 4).astype(np.float16)
+        depth = np.random.rand(3, 4).astype(np.float32)
+        parts = dict(
+            beauty=(beauty, dict(channels=list('rgba'), foo='bar')),
+            depth=(depth, dict(channels=['z'])),
+        )
+        target = Path(root, 'parts.exr')
+        tools.write_exr_parts(target, parts, codec=ImageCodec.ZIP)
+        return target, beauty, depth
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_read_exr_part_metadata(self):
+        with TemporaryDirectory() as root:
+            src, _, _ = self.write_exr_parts(root)
+            result = tools.read_exr_part_metadata(src)
+            self.assertEqual([x['name'] for x in result], ['beauty', 'depth'])
+            self.assertEqual(result[0]['channels'], list('rgba'))
+            self.assertEqual(result[0]['num_channels'], 4)
+            self.assertEqual(result[0]['foo'], 'bar')
+            self.assertEqual(result[1]['channels'], ['z'])
+            self.assertEqual(result[1]['compression'], ImageCodec.ZIP)
+            self.assertEqual(result[1]['type'], 'scanlineimage')
+
+            # single part files have one unnamed part
+            src = self.write_exr(root, np.float16)
+            result = tools.read_exr_part_metadata(src)
+            self.assertEqual(len(result), 1)
+            self.assertNotIn('name', result[0])
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_read_exr_parts(self):
+        with TemporaryDirectory() as root:
+            src, beauty, depth = self.write_exr_parts(root)
+
+            result = tools.read_exr_parts(src)
+            self.assertEqual(list(result.keys()), ['beauty', 'depth'])
+            np.testing.assert_array_equal(result['beauty'][0], beauty)
+            np.testing.assert_array_equal(result['depth'][0], depth[..., None])
+            self.assertEqual(result['depth'][0].dtype, np.float32)
+            self.assertEqual(result['depth'][1]['channels'], ['z'])
+
+            # first part alone
+            result = tools.read_exr_parts(src, parts=['beauty'], channels='b')
+            image, metadata = result['beauty']
+            np.testing.assert_array_equal(image, beauty[:, :, 2:3])
+            self.assertEqual(metadata['channels'], ['b'])
+
+            # other parts by index and name
+            result = tools.read_exr_parts(src, parts=[1, 'depth'])
+            self.assertEqual(list(result.keys()), ['depth'])
+
+            # unnamed parts are keyed by index
+            src = self.write_exr(root, np.float16)
+            result = tools.read_exr_parts(src)
+            self.assertEqual(list(result.keys()), ['0'])
+            self.assertEqual(result['0'][0].shape, (5, 10, 4))
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_read_exr_parts_errors(self):
+        with TemporaryDirectory() as root:
+            src, _, _ = self.write_exr_parts(root)
+            expected = r"Part 2 not found. Legal parts: \['beauty', 'depth'\]."
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_parts(src, parts=[2])
+
+            expected = 'Part foo not found.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_parts(src, parts=['foo'])
+
+            expected = 'No channels found matching pattern: x.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_parts(src, parts=['depth'], channels='x')
+
+            src = Path(root, 'foo.exr')
+            with self.assertRaisesRegex(IOError, 'foo.exr is not an EXR file.'):
+                tools.read_exr_part_metadata(src)
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_read_exr_multipart_error(self):
+        with TemporaryDirectory() as root:
+            src, _, _ = self.write_exr_parts(root)
+            expected = 'parts.exr is a multi-part EXR file. '
+            expected += 'Use read_exr_parts to read it.'
+            for func in [
+                tools.read_exr,
+                tools.read_exr_metadata,
+                tools.read_exr_layers,
+                tools.read_exr_channels,
+                lambda x: list(tools.iter_exr_scanlines(x)),
+            ]:
+                with self.assertRaisesRegex(ValueError, expected):
+                    func(src)
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_write_exr_parts(self):
+        with TemporaryDirectory() as root:
+            src, beauty, _ = self.write_exr_parts(root)
+
+            # read metadata round trips
+            parts = tools.read_exr_parts(src)
+            target = Path(root, 'copy.exr')
+            tools.write_exr_parts(target, parts)
+            result = tools.read_exr_parts(target)
+            np.testing.assert_array_equal(result['beauty'][0], beauty)
+            self.assertEqual(result['beauty'][1]['foo'], 'bar')
+            self.assertEqual(
+                result['beauty'][1]['compression'], ImageCodec.PIZ
+            )
+
+            target = Path(root, 'beauty.exr')
+            tools.write_exr(target, *parts['beauty'])
+            result, metadata = tools.read_exr(target)
+            np.testing.assert_array_equal(result, beauty)
+            self.assertEqual(metadata['foo'], 'bar')
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_write_exr_parts_errors(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            with self.assertRaisesRegex(ValueError, 'No parts given.'):
+                tools.write_exr_parts(target, {})
+
+            image = np.zeros((2, 2), dtype=np.float64)
+            expected = 'EXR cannot be saved with array of dtype: float64.'
+            with self.assertRaisesRegex(TypeError, expected):
+                tools.write_exr_parts(target, dict(foo=(image, {})))
+
+    @unittest.skipUnless(
+        hasattr(openexr, 'set_global_thread_count'), 'requires OpenEXR 3.3+'
+    )
+    def test_set_threads(self):
+        # a started thread pool deadlocks forked processes of later tests
+        previous = tools.get_threads()
+        try:
+            tools.set_threads(3)
+            self.assertEqual(tools.get_threads(), 3)
+            self.assertEqual(openexr.global_thread_count(), 3)
+
+            tools.set_threads()
+            self.assertEqual(tools.get_threads(), os.cpu_count() or 1)
+
+            tools.set_threads(0)
+            self.assertEqual(tools.get_threads(), 0)
+
+            expected = 'Thread count must not be negative. -1 < 0.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.set_threads(-1)
+            self.assertEqual(tools.get_threads(), 0)
+        finally:
+            tools.set_threads(previous)
+
+    @unittest.skipUnless(
+        hasattr(openexr, 'set_global_thread_count'), 'requires OpenEXR 3.3+'
+    )
+    def test_threads(self):
+        previous = tools.get_threads()
+        try:
+            tools.set_threads(1)
+            with TemporaryDirectory() as root:
+                target = Path(root, 'test.exr')
+                image = np.random.rand(300, 7, 4).astype(np.float16)
+
+                # thread count only applies during the call
+                tools.write_exr(target, image, {}, threads=2)
+                self.assertEqual(tools.get_threads(), 1)
+
+                result, _ = tools.read_exr(target, threads=3)
+                np.testing.assert_array_equal(result, image)
+                self.assertEqual(tools.get_threads(), 1)
+
+                tools.read_exr_layers(target, threads=2)
+                tools.read_exr_channels(target, threads=2)
+                parts = tools.read_exr_parts(target, threads=2)
+                tools.write_exr_parts(target, parts, threads=2)
+                self.assertEqual(tools.get_threads(), 1)
+
+                # restored after errors
+                src = self.write_png(root)
+                with self.assertRaisesRegex(IOError, 'is not an EXR file.'):
+                    tools.read_exr(src, threads=3)
+                self.assertEqual(tools.get_threads(), 1)
+
+                expected = 'Thread count must not be negative. -1 < 0.'
+                with self.assertRaisesRegex(ValueError, expected):
+                    tools.read_exr(target, threads=-1)
+                self.assertEqual(tools.get_threads(), 1)
+        finally:
+            tools.set_threads(previous)
+
+    @unittest.skipUnless(
+        hasattr(openexr, 'set_global_thread_count'), 'requires OpenEXR 3.3+'
+    )
+    def test_scope_threads(self):
+        @tools._scope_threads
+        def func(x, threads=None):
+            return x, tools.get_threads()
+
+        previous = tools.get_threads()
+        try:
+            tools.set_threads(1)
+            self.assertEqual(func('a', threads=3), ('a', 3))
+            self.assertEqual(func('a', 4), ('a', 4))
+            self.assertEqual(tools.get_threads(), 1)
+
+            # None leaves the global setting as is
+            self.assertEqual(func('a'), ('a', 1))
+            self.assertEqual(func.__name__, 'func')
+        finally:
+            tools.set_threads(previous)
+
+    def test_read_exr_mmap(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(7, 5, 4).astype(np.float16)
+            metadata = dict(channels=list('rgb') + ['z'], foo='bar')
+            codec = ImageCodec.UNCOMPRESSED
+            tools.write_exr(target, expected, metadata, codec=codec)
+
+            image, metadata = tools.read_exr_mmap(target)
+            self.assertEqual(list(image.keys()), list('rgbz'))
+            self.assertEqual(metadata['channels'], list('rgbz'))
+            self.assertEqual(metadata['foo'], 'bar')
+            self.assertEqual(metadata['compression'], codec)
+            for i, chan in enumerate('rgbz'):
+                self.assertEqual(image[chan].shape, (7, 5))
+                self.assertFalse(image[chan].flags.writeable)
+                self.assertFalse(image[chan].flags.owndata)
+                np.testing.assert_array_equal(image[chan], expected[:, :, i])
+
+            image, metadata = tools.read_exr_mmap(target, channels=['z', 'g'])
+            self.assertEqual(list(image.keys()), ['z', 'g'])
+            self.assertEqual(metadata['channels'], ['z', 'g'])
+
+    def test_read_exr_mmap_decreasing(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr').as_posix()
+            header = openexr.Header(5, 7)
+            header['compression'] = imath.Compression(0)
+            header['lineOrder'] = imath.LineOrder(imath.LineOrder.DECREASING_Y)
+            header['channels'] = dict(
+                R=imath.Channel(imath.PixelType(imath.PixelType.FLOAT)),
+                I=imath.Channel(imath.PixelType(imath.PixelType.UINT)),
+            )
+            r = np.random.rand(7, 5).astype(np.float32)
+            i = np.arange(35, dtype=np.uint32).reshape((7, 5))
+            output = openexr.OutputFile(target, header)
+            output.writePixels(dict(R=r.tobytes(), I=i.tobytes()))
+            output.close()
+
+            image, _ = tools.read_exr_mmap(target)
+            np.testing.assert_array_equal(image['r'], r)
+            np.testing.assert_array_equal(image['i'], i)
+            self.assertEqual(image['i'].dtype, np.uint32)
+
+    def test_read_exr_mmap_error(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.zeros((7, 5, 3), dtype=np.float16)
+            tools.write_exr(target, image, {}, codec=ImageCodec.ZIP)
+            expected = 'Only EXR files written with ImageCodec.UNCOMPRESSED '
+            expected += 'can be memory mapped. Given codec: ZIP.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.read_exr_mmap(target)
+
     def test_clean_exr_metadadata_channels(self):
         image = np.zeros((10, 10), dtype=np.float32)
         metadata = {}
@@ -111,6 +788,8 @@ def test_clean_exr_metadadata_forbidden(self):
             pixelAspectRatio='foo',
             screenWindowCenter='foo',
             screenWindowWidth='foo',
+            tiles='foo',
+            type='foo',
         )
         metadata = dict(foo='bar')
         metadata.update(forbidden)
@@ -188,3 +867,468 @@ def test_write_exr_compression(self):
             tools.write_exr(target, image, {}, codec=expected)
             _, result = tools.read_exr(target)
             self.assertEqual(result['compression'], expected)
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_write_exr_tiled(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(10, 9, 4).astype(np.float16)
+            metadata = dict(channels=list('rgba'), foo='bar', tags=['x', 'y'])
+            info = tools.write_exr(
+                target, expected, metadata, codec=ImageCodec.ZIP,
+                tile_size=(4, 3),
+            )
+            self.assertEqual(info['tile_size'], (4, 3))
+
+            result, metadata = tools.read_exr(target)
+            np.testing.assert_array_equal(result, expected)
+            self.assertEqual(metadata['compression'], ImageCodec.ZIP)
+            self.assertEqual(metadata['foo'], 'bar')
+            self.assertEqual(metadata['tiles']['x_size'], 4)
+            self.assertEqual(metadata['tiles']['y_size'], 3)
+            self.assertEqual(metadata['tiles']['mode'], 'ONE_LEVEL')
+
+            # tiled metadata round trips
+            tools.write_exr(target, result, metadata, tile_size=(8, 8))
+            _, metadata = tools.read_exr(target)
+            self.assertEqual(metadata['tiles']['x_size'], 8)
+
+            result, _ = tools.read_exr_tile(target, 1, 0)
+            np.testing.assert_array_equal(result, expected[:8, 8:])
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_write_exr_tiled_errors(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.zeros((10, 9, 4), dtype=np.float16)
+
+            expected = r'Tile size must be positive. \(0, 4\) < \(1, 1\).'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.write_exr(target, image, {}, tile_size=(0, 4))
+
+            expected = 'Metadata value of foo is not supported. '
+            expected += 'V2f is not str, int, float or list.'
+            with self.assertRaisesRegex(TypeError, expected):
+                tools.write_exr(
+                    target, image, dict(foo=imath.V2f(1, 2)), tile_size=(4, 4)
+                )
+
+    def test_get_level_count(self):
+        self.assertEqual(tools._get_level_count(1), 1)
+        self.assertEqual(tools._get_level_count(10), 4)
+        self.assertEqual(tools._get_level_count(16), 5)
+        self.assertEqual(tools._get_level_count(10, round_up=True), 5)
+        self.assertEqual(tools._get_level_count(16, round_up=True), 5)
+
+    def test_get_mip_levels(self):
+        image = np.random.rand(10, 7, 3).astype(np.float16)
+        result = tools.get_mip_levels(image)
+        self.assertEqual(list(result.keys()), [(0, 0), (1, 1), (2, 2), (3, 3)])
+        self.assertIs(result[(0, 0)], image)
+        shapes = [x.shape for x in result.values()]
+        self.assertEqual(shapes, [(10, 7, 3), (5, 3, 3), (2, 1, 3), (1, 1, 3)])
+        for level in result.values():
+            self.assertEqual(level.dtype, np.float16)
+
+        # odd sizes are cropped when rounding down
+        expected = image[:, :6].astype(np.float32)
+        expected = expected.reshape(5, 2, 3, 2, 3).mean(axis=(1, 3))
+        np.testing.assert_allclose(result[(1, 1)], expected, rtol=1e-3)
+
+        # odd sizes are edge padded when rounding up
+        result = tools.get_mip_levels(image[:, :, 0], rounding='up')
+        shapes = [x.shape for x in result.values()]
+        self.assertEqual(shapes, [(10, 7), (5, 4), (3, 2), (2, 1), (1, 1)])
+        np.testing.assert_allclose(
+            result[(1, 1)][:, 3],
+            image[:, 6, 0].astype(np.float32).reshape(5, 2).mean(axis=1),
+            rtol=1e-3,
+        )
+
+    def test_get_mip_levels_ripmap(self):
+        image = np.random.rand(10, 7).astype(np.float32)
+        result = tools.get_mip_levels(image, mode='ripmap')
+        self.assertEqual(len(result), 4 * 3)
+        self.assertEqual(result[(2, 0)].shape, (10, 1))
+        self.assertEqual(result[(0, 3)].shape, (1, 7))
+        self.assertEqual(result[(1, 2)].shape, (2, 3))
+        np.testing.assert_allclose(
+            result[(1, 0)], image[:, :6].reshape(10, 3, 2).mean(axis=2)
+        )
+        np.testing.assert_allclose(
+            result[(0, 1)], image.reshape(5, 2, 7).mean(axis=1)
+        )
+
+    def test_get_mip_levels_errors(self):
+        image = np.zeros((4, 4), dtype=np.float16)
+        expected = r"Illegal mode: foo. Legal modes: \['mipmap', 'ripmap'\]."
+        with self.assertRaisesRegex(ValueError, expected):
+            tools.get_mip_levels(image, mode='foo')
+
+        expected = r"Illegal rounding: foo. Legal roundings: \['down', 'up'\]."
+        with self.assertRaisesRegex(ValueError, expected):
+            tools.get_mip_levels(image, rounding='foo')
+
+    def test_get_trial_sample(self):
+        image = np.arange(200, dtype=np.float32).reshape((200, 1, 1))
+        result = tools._get_trial_sample(image)
+        self.assertEqual(result.shape, (96, 1, 1))
+        self.assertEqual(result[::32, 0, 0].tolist(), [0, 64, 160])
+
+        image = np.zeros((90, 2, 1), dtype=np.float32)
+        self.assertIs(tools._get_trial_sample(image), image)
+
+    def test_select_codec(self):
+        image = np.zeros((100, 20, 3), dtype=np.float16)
+        codec, trials = tools.select_codec(image, {})
+        self.assertEqual(len(trials), 6)
+        self.assertEqual(trials[-1]['codec'], ImageCodec.PXR24)
+        smallest = min(trials, key=lambda x: x['ratio'])
+        self.assertEqual(codec, smallest['codec'])
+        self.assertNotEqual(codec, ImageCodec.UNCOMPRESSED)
+        self.assertIsNone(trials[0]['decode_seconds'])
+
+        candidates = [ImageCodec.ZIP, ImageCodec.UNCOMPRESSED]
+        codec, trials = tools.select_codec(
+            image, {}, objective='encode', candidates=candidates
+        )
+        fastest = min(trials, key=lambda x: x['encode_seconds'])
+        self.assertEqual(codec, fastest['codec'])
+
+        # only zip is within budget
+        codec, trials = tools.select_codec(
+            image, {}, objective='decode', size_budget=0.5,
+            candidates=candidates
+        )
+        self.assertEqual(codec, ImageCodec.ZIP)
+        self.assertGreater(trials[1]['decode_seconds'], 0)
+
+        # smallest codec is selected if no codec is within budget
+        codec, _ = tools.select_codec(
+            image, {}, objective='decode', size_budget=0, candidates=candidates
+        )
+        self.assertEqual(codec, ImageCodec.ZIP)
+
+    def test_select_codec_pixel_type(self):
+        # ratio is relative to the size of the pixels as written
+        image = np.random.rand(100, 20, 3)
+        candidates = [ImageCodec.RLE, ImageCodec.UNCOMPRESSED]
+        codec, trials = tools.select_codec(
+            image, {}, objective='decode', size_budget=0.3,
+            candidates=candidates, pixel_type='float16'
+        )
+        for trial in trials:
+            self.assertGreater(trial['ratio'], 0.9)
+
+        # no codec compresses noise within budget, so smallest is selected
+        smallest = min(trials, key=lambda x: x['ratio'])
+        self.assertEqual(codec, smallest['codec'])
+
+        pixel_type = {'*': 'float16', 'b': 'float32'}
+        _, trials = tools.select_codec(
+            image, dict(channels=list('rgb')),
+            candidates=[ImageCodec.UNCOMPRESSED], pixel_type=pixel_type
+        )
+        self.assertGreater(trials[0]['ratio'], 1)
+        self.assertLess(trials[0]['ratio'], 1.2)
+
+    def test_select_codec_error(self):
+        image = np.zeros((10, 20, 3), dtype=np.float16)
+        expected = "Illegal objective: foo. Legal objectives: .'size', "
+        expected += "'encode', 'decode'.."
+        with self.assertRaisesRegex(ValueError, expected):
+            tools.select_codec(image, {}, objective='foo')
+
+    def test_write_exr_auto(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.zeros((100, 20), dtype=np.float32)
+            expected[50:] = 1
+            info = tools.write_exr(target, expected, {}, codec='auto')
+            self.assertEqual(info['objective'], 'size')
+            self.assertEqual(len(info['trials']), 5)
+            self.assertNotEqual(info['codec'], ImageCodec.UNCOMPRESSED)
+
+            result, metadata = tools.read_exr(target)
+            self.assertEqual(metadata['compression'], info['codec'])
+            np.testing.assert_array_equal(result[:, :, 0], expected)
+
+            info = tools.write_exr(target, expected, {}, codec=ImageCodec.ZIP)
+            self.assertEqual(info, dict(codec=ImageCodec.ZIP))
+
+            expected = 'Illegal codec: zip. Codec must be an ImageCodec or "auto".'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.write_exr(target, np.zeros((2, 2), np.float16), {}, codec='zip')
+
+    def test_write_exr_planar(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(3, 10, 5).astype(np.float32)
+            metadata = dict(channels=list('rgb'))
+            tools.write_exr(target, expected, metadata, layout='planar')
+
+            result, metadata = tools.read_exr(target, layout='planar')
+            np.testing.assert_array_equal(result, expected)
+            self.assertEqual(metadata['channels'], list('rgb'))
+
+            expected = np.random.rand(10, 5).astype(np.float16)
+            tools.write_exr(target, expected, {}, layout='planar')
+            result, metadata = tools.read_exr(target, layout='planar')
+            np.testing.assert_array_equal(result[0], expected)
+            self.assertEqual(metadata['channels'], ['l'])
+
+            image = np.zeros((3, 10, 5), dtype=np.float16)
+            expected = 'Illegal layout: foo. Legal layouts: interleaved, planar.'
+            with self.assertRaisesRegex(ValueError, expected):
+                tools.write_exr(target, image, {}, layout='foo')
+
+    def test_write_exr_pixel_type(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(5, 10, 4)
+            tools.write_exr(target, image, {}, pixel_type=np.float16)
+            result, _ = tools.read_exr(target)
+            self.assertEqual(result.dtype, np.float16)
+            np.testing.assert_array_equal(result, image.astype(np.float16))
+
+            # planar float32 to float16
+            image = np.random.rand(2, 5, 10).astype(np.float32)
+            tools.write_exr(
+                target, image, {}, layout='planar', pixel_type='float16'
+            )
+            result, _ = tools.read_exr(target, layout='planar')
+            np.testing.assert_array_equal(result, image.astype(np.float16))
+
+            info = tools.write_exr(
+                target, image, {}, codec='auto', layout='planar',
+                pixel_type=np.float16,
+            )
+            codecs = [x['codec'] for x in info['trials']]
+            self.assertIn(ImageCodec.PXR24, codecs)
+
+            expected = 'EXR cannot be saved with array of dtype: float64.'
+            with self.assertRaisesRegex(TypeError, expected):
+                tools.write_exr(target, image, {}, pixel_type=np.float64)
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_write_exr_pixel_type_tiled(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(5, 10, 4)
+            tools.write_exr(
+                target, image, {}, pixel_type=np.float32, tile_size=(4, 4)
+            )
+            result, metadata = tools.read_exr(target)
+            self.assertIn('tiles', metadata)
+            np.testing.assert_array_equal(result, image.astype(np.float32))
+
+    def test_get_channel_dtypes(self):
+        channels = ['R', 'G', 'B', 'A', 'z', 'id']
+        result = tools._get_channel_dtypes(channels, np.float32)
+        self.assertEqual(result, [np.float32] * 6)
+
+        result = tools._get_channel_dtypes(channels, np.float64, 'float16')
+        self.assertEqual(result, [np.float16] * 6)
+
+        pixel_type = {'*': np.float16, 'Z': np.float32, 'id': np.uint32}
+        result = tools._get_channel_dtypes(channels, np.float64, pixel_type)
+        expected = [np.float16] * 4 + [np.float32, np.uint32]
+        self.assertEqual(result, expected)
+
+        # unmatched channels keep image dtype
+        result = tools._get_channel_dtypes(channels, np.float16, dict(z='f4'))
+        self.assertEqual(result, [np.float16] * 4 + [np.float32, np.float16])
+
+        expected = 'No channels found matching pattern: foo.'
+        with self.assertRaisesRegex(ValueError, expected):
+            tools._get_channel_dtypes(channels, np.float16, dict(foo='f4'))
+
+    def test_write_exr_mixed_pixel_types(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(5, 10, 6).astype(np.float32)
+            image[:, :, 5] = np.arange(50).reshape(5, 10)
+            metadata = dict(channels=list('rgbaz') + ['id'])
+            pixel_type = {'[rgba]': 'float16', 'id': 'uint32'}
+            tools.write_exr(target, image, metadata, pixel_type=pixel_type)
+
+            img = openexr.InputFile(target.as_posix())
+            result = {
+                k: str(v.type) for k, v in img.header()['channels'].items()
+            }
+            expected = dict(
+                R='HALF', G='HALF', B='HALF', A='HALF', z='FLOAT', id='UINT'
+            )
+            self.assertEqual(result, expected)
+
+            result, _ = tools.read_exr(target, channels=['r', 'z'])
+            self.assertEqual(result.dtype, np.float32)
+            np.testing.assert_array_equal(
+                result[:, :, 0], image[:, :, 0].astype(np.float16)
+            )
+            np.testing.assert_array_equal(result[:, :, 1], image[:, :, 4])
+
+            result, _ = tools.read_exr(target, channels='id')
+            self.assertEqual(result.dtype, np.uint32)
+            np.testing.assert_array_equal(
+                result[:, :, 0], np.arange(50).reshape(5, 10)
+            )
+
+            # half channels shrink file
+            full = Path(root, 'full.exr')
+            codec = ImageCodec.UNCOMPRESSED
+            tools.write_exr(full, image, metadata, codec=codec)
+            tools.write_exr(
+                target, image, metadata, codec=codec, pixel_type=pixel_type
+            )
+            self.assertLess(os.path.getsize(target), os.path.getsize(full))
+
+    def test_write_exr_uint(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.arange(50, dtype=np.uint32).reshape(5, 10)
+            tools.write_exr(target, image, dict(channels=['id']))
+            result, _ = tools.read_exr(target)
+            self.assertEqual(result.dtype, np.uint32)
+            np.testing.assert_array_equal(result[:, :, 0], image)
+
+            info = tools.write_exr(
+                target, image, dict(channels=['id']), codec='auto'
+            )
+            codecs = [x['codec'] for x in info['trials']]
+            self.assertIn(ImageCodec.PXR24, codecs)
+
+            expected = 'EXR cannot be saved with array of dtype: float64.'
+            with self.assertRaisesRegex(TypeError, expected):
+                tools.write_exr(
+                    target, np.zeros((5, 10, 2)), {},
+                    pixel_type={'aux_0000': np.float16},
+                )
+
+    @unittest.skipUnless(hasattr(openexr, 'File'), 'requires OpenEXR 3.3+')
+    def test_write_exr_mixed_pixel_types_tiled(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            image = np.random.rand(5, 10, 2)
+            tools.write_exr(
+                target, image, dict(channels=['r', 'id']),
+                pixel_type=dict(r='float16', id='uint32'), tile_size=(4, 4),
+            )
+            result, _ = tools.read_exr(target, channels='id')
+            self.assertEqual(result.dtype, np.uint32)
+
+    def test_pack_channels(self):
+        image = np.random.rand(4, 5, 3).astype(np.float16)
+        result = tools._pack_channels(image, list('RGB'))
+        self.assertEqual(list(result.keys()), list('RGB'))
+        for i, chan in enumerate('RGB'):
+            self.assertTrue(result[chan].flags.c_contiguous)
+            np.testing.assert_array_equal(result[chan], image[:, :, i])
+
+        # planar images are not copied
+        planar = np.random.rand(3, 4, 5).astype(np.float32)
+        image = np.moveaxis(planar, 0, 2)
+        result = tools._pack_channels(image, list('RGB'))
+        for i, chan in enumerate('RGB'):
+            self.assertTrue(np.shares_memory(result[chan], planar))
+            np.testing.assert_array_equal(result[chan], planar[i])
+
+        # mixed dtypes
+        dtypes = [np.dtype(x) for x in ['f2', 'f4', 'u4']]
+        result = tools._pack_channels(image, list('RGB'), dtypes)
+        for i, chan in enumerate('RGB'):
+            self.assertEqual(result[chan].dtype, dtypes[i])
+            self.assertTrue(result[chan].flags.c_contiguous)
+
+        # dtype is converted in the same copy
+        result = tools._pack_channels(image, list('RGB'), [np.float16] * 3)
+        for i, chan in enumerate('RGB'):
+            self.assertEqual(result[chan].dtype, np.float16)
+            self.assertTrue(result[chan].flags.c_contiguous)
+            np.testing.assert_array_equal(
+                result[chan], planar[i].astype(np.float16)
+            )
+
+    def test_exr_writer(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(10, 5, 3).astype(np.float32)
+            metadata = dict(channels=list('rgb'), foo='bar')
+            with tools.ExrWriter(
+                target, expected.shape, metadata, dtype=np.float32,
+                codec=ImageCodec.ZIP
+            ) as writer:
+                self.assertEqual(writer.height, 10)
+                self.assertEqual(writer.width, 5)
+                for i in range(0, 10, 4):
+                    writer.write(expected[i:i + 4])
+                self.assertEqual(writer.rows_written, 10)
+
+            result, metadata = tools.read_exr(target)
+            np.testing.assert_array_equal(result, expected)
+            self.assertEqual(metadata['channels'], list('rgb'))
+            self.assertEqual(metadata['foo'], 'bar')
+            self.assertEqual(metadata['compression'], ImageCodec.ZIP)
+
+    def test_exr_writer_grayscale(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = np.random.rand(6, 5).astype(np.float16)
+            with tools.ExrWriter(target, (6, 5), {}) as writer:
+                writer.write(expected[:3])
+                writer.write(expected[3:])
+
+            result, metadata = tools.read_exr(target)
+            np.testing.assert_array_equal(result[:, :, 0], expected)
+            self.assertEqual(metadata['channels'], ['l'])
+
+    def test_exr_writer_errors(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            expected = 'EXR cannot be saved with array of dtype: uint8.'
+            with self.assertRaisesRegex(TypeError, expected):
+                tools.ExrWriter(target, (6, 5, 3), {}, dtype=np.uint8)
+
+            with tools.ExrWriter(target, (6, 5, 3), {}) as writer:
+                expected = 'Block dtype float32 does not match writer dtype '
+                expected += 'float16.'
+                with self.assertRaisesRegex(TypeError, expected):
+                    writer.write(np.zeros((2, 5, 3), dtype=np.float32))
+
+                expected = r'Block shape \(2, 4, 3\) does not match image '
+                expected += r'width and channels: \(5, 3\).'
+                with self.assertRaisesRegex(ValueError, expected):
+                    writer.write(np.zeros((2, 4, 3), dtype=np.float16))
+
+                writer.write(np.zeros((4, 5, 3), dtype=np.float16))
+                expected = r'Block of 3 rows exceeds image height. 4 \+ 3 > 6.'
+                with self.assertRaisesRegex(ValueError, expected):
+                    writer.write(np.zeros((3, 5, 3), dtype=np.float16))
+                writer.write(np.zeros((2, 5, 3), dtype=np.float16))
+
+    def test_exr_writer_incomplete(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+            writer = tools.ExrWriter(target, (6, 5, 3), {})
+            writer.write(np.zeros((4, 5, 3), dtype=np.float16))
+            expected = 'Image is incomplete. 4 of 6 rows written. '
+            expected += f'{target.as_posix()} removed.'
+            with self.assertRaisesRegex(ValueError, expected):
+                writer.close()
+            self.assertFalse(target.exists())
+
+            with self.assertRaisesRegex(ValueError, expected):
+                with tools.ExrWriter(target, (6, 5, 3), {}) as writer:
+                    writer.write(np.zeros((4, 5, 3), dtype=np.float16))
+            self.assertFalse(target.exists())
+
+    def test_exr_writer_exception(self):
+        with TemporaryDirectory() as root:
+            target = Path(root, 'test.exr')
+
+            # errors in the with block are not masked by the incomplete error
+            with self.assertRaisesRegex(RuntimeError, 'render failed'):
+                with tools.ExrWriter(target, (6, 5, 3), {}) as writer:
+                    writer.write(np.zeros((2, 5, 3), dtype=np.float16))
+                    raise RuntimeError('render failed')
+            self.assertFalse(target.exists())